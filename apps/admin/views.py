@@ -8,6 +8,7 @@ from django.utils import timezone
 from datetime import timedelta
 from apps.orders.models import Order
 from apps.users.models import User
+from apps.users.devices import register_device
 from apps.delivery.models import DeliveryAssignment
 from apps.admin.serializers import AdminOrderSerializer, DeliveryPartnerSerializer, DashboardStatsSerializer
 
@@ -120,8 +121,9 @@ def assign_delivery_partner(request, order_id):
         order.save()
         
         # Send notification to delivery partner
-        from core.utils import send_delivery_notification
-        send_delivery_notification(order, 'assigned')
+        from apps.delivery.tasks import notify_delivery_partner
+        from core.dispatch import enqueue
+        enqueue(notify_delivery_partner, order.id, 'assigned')
 
         return Response({'message': 'Delivery partner assigned successfully'})
 
@@ -151,8 +153,9 @@ def update_order_status(request, order_id):
         order.save()
 
         # Send notifications
-        from core.utils import send_order_status_notification
-        send_order_status_notification(order, new_status)
+        from apps.orders.tasks import notify_order_status
+        from core.dispatch import enqueue
+        enqueue(notify_order_status, order.id, new_status)
 
         return Response({'message': f'Order status updated to {new_status}'})
 
@@ -175,8 +178,7 @@ def update_fcm_token(request):
     if not token:
         return Response({'error': 'FCM token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    request.user.fcm_token = token
-    request.user.save()
+    register_device(request.user, token, platform=request.data.get('platform'))
 
     return Response({'message': 'FCM token updated successfully'})
 
@@ -2,11 +2,8 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
+from core.websocket_auth import authenticate_scope
 from .models import ChatRoom, ChatMessage
-from rest_framework_simplejwt.tokens import UntypedToken
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from jwt import decode as jwt_decode
-from django.conf import settings
 
 User = get_user_model()
 
@@ -17,23 +14,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.room_group_name = None
         self.user = None
 
-        # Get token from query string
-        query_string = self.scope.get('query_string', b'').decode()
-        token = None
-        if 'token=' in query_string:
-            token = query_string.split('token=')[-1].split('&')[0]
-        
-        if not token:
-            await self.close()
-            return
-
-        # Authenticate user
-        try:
-            self.user = await self.authenticate_user(token)
-            if not self.user:
-                await self.close()
-                return
-        except Exception as e:
+        # Authenticate user from the ?token= access token
+        self.user = await authenticate_scope(self.scope)
+        if not self.user:
             await self.close()
             return
 
@@ -127,17 +110,6 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'room_id': event['room_id']
         }))
 
-    @database_sync_to_async
-    def authenticate_user(self, token):
-        """Authenticate user from JWT token"""
-        try:
-            UntypedToken(token)
-            decoded_data = jwt_decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            user_id = decoded_data.get('user_id')
-            return User.objects.get(id=user_id)
-        except (InvalidToken, TokenError, User.DoesNotExist) as e:
-            return None
-
     @database_sync_to_async
     def verify_room_access(self, room_id, user):
         """Verify user has access to this chat room"""
@@ -30,6 +30,9 @@ class ChatMessage(models.Model):
     class Meta:
         db_table = 'chat_messages'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['room', 'created_at', 'id'], name='chat_message_room_created_idx'),
+        ]
 
     def __str__(self):
         return f"Message from {self.sender.username} in Room {self.room.id}"
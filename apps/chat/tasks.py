@@ -0,0 +1,14 @@
+from celery import shared_task
+from django.conf import settings
+from apps.users.models import User
+from core.utils import TRANSIENT_FCM_ERRORS, send_chat_message_fcm
+from .models import ChatMessage
+
+@shared_task(autoretry_for=TRANSIENT_FCM_ERRORS, retry_backoff=True, max_retries=settings.NOTIFICATION_MAX_RETRIES)
+def notify_chat_message(message_id, recipient_id):
+    """Push a new chat message to the other participant of the room"""
+    message = ChatMessage.objects.select_related('room', 'sender').filter(id=message_id).first()
+    recipient = User.objects.filter(id=recipient_id).first()
+    if message is None or recipient is None:
+        return
+    send_chat_message_fcm(recipient, message.room, message)
@@ -7,6 +7,7 @@ from .models import ChatRoom, ChatMessage
 from .serializers import ChatRoomSerializer, ChatMessageSerializer
 from apps.orders.models import Order
 from apps.delivery.models import DeliveryAssignment
+from core.pagination import KeysetPagination
 
 class ChatRoomListView(generics.ListAPIView):
     """List all chat rooms for the authenticated user"""
@@ -48,6 +49,8 @@ class ChatMessageListView(generics.ListAPIView):
     """List messages in a chat room"""
     serializer_class = ChatMessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('created_at', 'id')
 
     def get_queryset(self):
         room_id = self.kwargs['room_id']
@@ -138,8 +141,9 @@ def send_message(request, room_id):
         msg = ChatMessage.objects.create(room=room, sender=request.user, message=message_text)
         recipient = room.delivery_partner if request.user == room.customer else room.customer
 
-        from core.utils import send_chat_message_fcm
-        send_chat_message_fcm(recipient, room, msg)
+        from .tasks import notify_chat_message
+        from core.dispatch import enqueue
+        enqueue(notify_chat_message, msg.id, recipient.id)
 
         serializer = ChatMessageSerializer(msg)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -3,7 +3,9 @@ from django.contrib.auth import get_user_model
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from apps.orders.models import Order
-from .models import DeliveryAssignment, LocationUpdate
+from core.dispatch import enqueue
+from .tasks import compress_location_trail
+from .models import DeliveryAssignment, LocationTrail, LocationUpdate
 
 User = get_user_model()
 
@@ -48,6 +50,7 @@ class DeliveryAssignmentAdmin(admin.ModelAdmin):
         for assignment in queryset:
             assignment.order.status = 'delivered'
             assignment.order.save()
+            enqueue(compress_location_trail, assignment.id)
         self.message_user(request, f"{queryset.count()} deliveries marked as delivered")
     marked_delivered.short_description = "Mark selected as delivered"
 
@@ -67,4 +70,10 @@ class LocationUpdateAdmin(admin.ModelAdmin):
                 request,
                 format_html(f'View location on <a href="{map_url}" target="_blank">Open Map</a>.')
             )
-    view_on_map.short_description = "View selected location on map"
\ No newline at end of file
+    view_on_map.short_description = "View selected location on map"
+
+@admin.register(LocationTrail)
+class LocationTrailAdmin(admin.ModelAdmin):
+    list_display = ('assignment', 'point_count', 'raw_point_count', 'started_at', 'ended_at')
+    search_fields = ('assignment__order__order_number', 'assignment__delivery_partner__username')
+    readonly_fields = ('created_at',)
@@ -0,0 +1,126 @@
+import asyncio
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.db import database_sync_to_async
+from django.conf import settings
+from apps.orders.models import Order
+from core.websocket_auth import authenticate_scope
+from .models import DeliveryAssignment
+from .tracking import group_name, latest_position
+
+
+class TrackingConsumer(AsyncWebsocketConsumer):
+    """Live position of a delivery, pushed instead of polled.
+
+    On connect the client gets a ``snapshot`` (latest position and assignment
+    status); after that only deltas: ``position`` whenever the rider uploads
+    a newer fix and ``status`` when the assignment moves on. Positions are
+    sent at most once per ``TRACKING_PUSH_MIN_INTERVAL`` seconds per
+    connection; fixes arriving faster are coalesced and the newest one is
+    flushed when the interval is up.
+    """
+
+    async def connect(self):
+        """Handle WebSocket connection"""
+        self.order_id = None
+        self.group_name = None
+        self.user = None
+        self.last_push = 0
+        self.pending_position = None
+        self.flush_task = None
+
+        # Authenticate user from the ?token= access token
+        self.user = await authenticate_scope(self.scope)
+        if not self.user:
+            await self.close()
+            return
+
+        self.order_id = int(self.scope['url_route']['kwargs']['order_id'])
+
+        # Only the customer and the assigned delivery partner may track an order
+        snapshot = await self.get_snapshot(self.order_id, self.user)
+        if snapshot is None:
+            await self.close()
+            return
+
+        # Join before sending the snapshot so no update falls in between
+        self.group_name = group_name(self.order_id)
+        await self.channel_layer.group_add(
+            self.group_name,
+            self.channel_name
+        )
+
+        await self.accept()
+        await self.send(text_data=json.dumps({'type': 'snapshot', **snapshot}))
+
+    async def disconnect(self, close_code):
+        """Handle WebSocket disconnection"""
+        if self.flush_task:
+            self.flush_task.cancel()
+        if self.group_name:
+            await self.channel_layer.group_discard(
+                self.group_name,
+                self.channel_name
+            )
+
+    async def tracking_position(self, event):
+        """Push a new position, throttled per connection"""
+        self.pending_position = event['position']
+        if self.flush_task:
+            # A trailing flush is already scheduled and will send the newest fix
+            return
+
+        wait = self.last_push + settings.TRACKING_PUSH_MIN_INTERVAL - asyncio.get_running_loop().time()
+        if wait <= 0:
+            await self.flush_position()
+        else:
+            self.flush_task = asyncio.ensure_future(self.flush_position_later(wait))
+
+    async def tracking_status(self, event):
+        """Push an assignment status change"""
+        await self.send(text_data=json.dumps({
+            'type': 'status',
+            'status': event['status']
+        }))
+
+    async def flush_position_later(self, wait):
+        await asyncio.sleep(wait)
+        self.flush_task = None
+        await self.flush_position()
+
+    async def flush_position(self):
+        position, self.pending_position = self.pending_position, None
+        if position is None:
+            return
+        self.last_push = asyncio.get_running_loop().time()
+        await self.send(text_data=json.dumps({
+            'type': 'position',
+            'latitude': position['latitude'],
+            'longitude': position['longitude'],
+            'timestamp': position['timestamp']
+        }))
+
+    @database_sync_to_async
+    def get_snapshot(self, order_id, user):
+        """Current tracking state of the order, or None if ``user`` may not track it"""
+        try:
+            order = Order.objects.get(id=order_id)
+        except Order.DoesNotExist:
+            return None
+        assignment = DeliveryAssignment.objects.filter(order=order).first()
+
+        is_partner = assignment is not None and assignment.delivery_partner_id == user.id
+        if order.customer_id != user.id and not is_partner:
+            return None
+
+        if assignment is None:
+            return {'status': order.status, 'location': None, 'assignment_status': None}
+        return {
+            'status': order.status,
+            'location': latest_position(assignment.delivery_partner_id, order.id),
+            'assignment_status': {
+                'picked_up': assignment.picked_up_at is not None,
+                'out_for_delivery': order.status == 'out_for_delivery',
+                'delivered': assignment.delivered_at is not None,
+            }
+        }
@@ -0,0 +1,111 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils import timezone
+from apps.delivery.models import LocationTrail, LocationUpdate
+
+ARCHIVE_FIELDS = ('id', 'order_id', 'delivery_partner_id', 'latitude', 'longitude', 'timestamp')
+TRAIL_ARCHIVE_FIELDS = (
+    'id', 'assignment_id', 'polyline', 'timestamps', 'point_count', 'raw_point_count', 'started_at', 'ended_at'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Archive location fixes of orders delivered (or cancelled) more than --days ago, and '
+        'compressed trails of those deliveries, to gzip JSON Lines files and delete them, in batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.LOCATION_RETENTION_DAYS,
+            help=f'Keep fixes of orders finished within this many days (default {settings.LOCATION_RETENTION_DAYS})'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per delete (default 5000)')
+        parser.add_argument(
+            '--archive-dir', default=settings.LOCATION_ARCHIVE_DIR,
+            help=f'Directory for the archive files (default {settings.LOCATION_ARCHIVE_DIR})'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be pruned')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = LocationUpdate.objects.filter(
+            Q(order__delivery_assignment__delivered_at__lt=cutoff)
+            | Q(order__status='cancelled', order__updated_at__lt=cutoff)
+        )
+        expired_trails = LocationTrail.objects.filter(assignment__delivered_at__lt=cutoff)
+
+        if options['dry_run']:
+            rows = expired.count()
+            orders = expired.values('order_id').distinct().count()
+            self.stdout.write(f'{rows} fixes of {orders} orders finished before {cutoff:%Y-%m-%d %H:%M} would be pruned')
+            self.stdout.write(f'{expired_trails.count()} trails of deliveries before {cutoff:%Y-%m-%d %H:%M} would be pruned')
+            return
+
+        os.makedirs(options['archive_dir'], exist_ok=True)
+        stamp = f'{timezone.now():%Y%m%dT%H%M%S}'
+
+        pruned, path = self.archive_and_delete(
+            expired.values(*ARCHIVE_FIELDS),
+            os.path.join(options['archive_dir'], f'locations-{stamp}.jsonl.gz'),
+            options,
+        )
+        if pruned:
+            self.stdout.write(self.style.SUCCESS(f'{pruned} fixes archived to {path} and deleted'))
+        else:
+            self.stdout.write(f'No fixes of orders finished before {cutoff:%Y-%m-%d %H:%M}')
+
+        # Order and partner ids are archived with each trail so it still means
+        # something once the assignment itself is gone
+        pruned, path = self.archive_and_delete(
+            expired_trails.values(
+                *TRAIL_ARCHIVE_FIELDS,
+                order_id=F('assignment__order_id'),
+                delivery_partner_id=F('assignment__delivery_partner_id'),
+            ),
+            os.path.join(options['archive_dir'], f'trails-{stamp}.jsonl.gz'),
+            options,
+        )
+        if pruned:
+            self.stdout.write(self.style.SUCCESS(f'{pruned} trails archived to {path} and deleted'))
+        else:
+            self.stdout.write(f'No trails of deliveries before {cutoff:%Y-%m-%d %H:%M}')
+
+    def archive_and_delete(self, rows_queryset, path, options):
+        """Write ``rows_queryset`` (a ``.values()`` queryset with ``id``) to ``path`` and delete
+        the rows; returns ``(rows pruned, path)``, removing the file if nothing was pruned
+        """
+        model = rows_queryset.model
+        # Walk the table by id so each batch is a short, bounded scan and
+        # delete; the archive is written before the rows it holds are deleted
+        pruned = 0
+        last_id = 0
+        with gzip.open(path, 'wt', encoding='utf-8') as archive:
+            while True:
+                rows = list(rows_queryset.filter(id__gt=last_id).order_by('id')[:options['batch_size']])
+                if not rows:
+                    break
+                for row in rows:
+                    archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                archive.flush()
+
+                model.objects.filter(id__in=[row['id'] for row in rows]).delete()
+                pruned += len(rows)
+                last_id = rows[-1]['id']
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{pruned} {model._meta.verbose_name_plural} pruned')
+
+        if not pruned:
+            os.remove(path)
+        return pruned, path
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 17:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0004_delivery_earnings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deliveryearnings',
+            index=models.Index(fields=['delivery_partner', 'earned_at', 'id'], name='earnings_partner_earned_idx'),
+        ),
+    ]
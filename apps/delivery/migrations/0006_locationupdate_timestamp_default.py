@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 19:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0005_deliveryearnings_earnings_partner_earned_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='locationupdate',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0006_locationupdate_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationTrail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('polyline', models.TextField()),
+                ('timestamps', models.TextField()),
+                ('point_count', models.PositiveIntegerField()),
+                ('raw_point_count', models.PositiveIntegerField()),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='location_trail', to='delivery.deliveryassignment')),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0007_locationtrail'),
+        ('orders', '0004_order_order_customer_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='locationupdate',
+            index=models.Index(fields=['order', 'delivery_partner', '-timestamp'], name='location_order_partner_ts_idx'),
+        ),
+    ]
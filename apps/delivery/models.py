@@ -1,6 +1,9 @@
 from django.db import models
+from django.utils import timezone
+from datetime import timedelta
 from apps.users.models import User, DeliveryPartnerProfile
 from apps.orders.models import Order
+from core.geo import decode_polyline, delta_decode
 
 class DeliveryAssignment(models.Model):
     delivery_partner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='deliveries')
@@ -18,15 +21,51 @@ class LocationUpdate(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='location_updates')
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Latest fix of a delivery (tracking fallback) is a seek on this index
+            models.Index(fields=['order', 'delivery_partner', '-timestamp'], name='location_order_partner_ts_idx'),
+        ]
 
     def __str__(self):
         return f"Location: {self.delivery_partner.username} at {self.timestamp}"
 
 
+class LocationTrail(models.Model):
+    """Compressed GPS trail of a completed delivery.
+
+    Replaces the delivery's ``LocationUpdate`` rows once it is delivered (see
+    ``compress_location_trail``): redundant fixes are dropped, coordinates are
+    stored as an encoded polyline and timestamps as delta-encoded seconds
+    since ``started_at``.
+    """
+    PRECISION = 5  # polyline decimal places, ~1 m
+
+    assignment = models.OneToOneField(DeliveryAssignment, on_delete=models.CASCADE, related_name='location_trail')
+    polyline = models.TextField()
+    timestamps = models.TextField()
+    point_count = models.PositiveIntegerField()
+    raw_point_count = models.PositiveIntegerField()
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def points(self):
+        """``(latitude, longitude, timestamp)`` of every kept fix, oldest first"""
+        coordinates = decode_polyline(self.polyline, self.PRECISION)
+        offsets = delta_decode(self.timestamps)
+        return [
+            (lat, lng, self.started_at + timedelta(seconds=offset))
+            for (lat, lng), offset in zip(coordinates, offsets)
+        ]
+
+    def __str__(self):
+        return f"Trail: {self.assignment.order.order_number} ({self.point_count}/{self.raw_point_count} points)"
+
+
 class DeliveryEarnings(models.Model):
     delivery_partner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='earnings')
     assignment = models.OneToOneField(DeliveryAssignment, on_delete=models.CASCADE, related_name='earnings')
@@ -35,6 +74,9 @@ class DeliveryEarnings(models.Model):
 
     class Meta:
         ordering = ['-earned_at']
+        indexes = [
+            models.Index(fields=['delivery_partner', 'earned_at', 'id'], name='earnings_partner_earned_idx'),
+        ]
 
     def __str__(self):
         return f"Earnings: {self.delivery_partner.username} - ₹{self.amount}"
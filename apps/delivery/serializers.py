@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import DeliveryAssignment, LocationUpdate, DeliveryEarnings
 
@@ -29,6 +30,17 @@ class LocationUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = LocationUpdate
         fields = '__all__'
+        read_only_fields = ('timestamp',)
+
+class LocationFixSerializer(serializers.Serializer):
+    """One GPS fix in a batch upload; ``timestamp`` is when the phone took it"""
+    order = serializers.IntegerField(min_value=1)
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    timestamp = serializers.DateTimeField(required=False)
+
+class LocationBatchSerializer(serializers.Serializer):
+    fixes = LocationFixSerializer(many=True, allow_empty=False, max_length=settings.LOCATION_BATCH_MAX_FIXES)
 
 
 class DeliveryEarningsSerializer(serializers.ModelSerializer):
@@ -0,0 +1,105 @@
+from celery import shared_task
+from decimal import Decimal
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils.dateparse import parse_datetime
+from apps.orders.models import Order
+from apps.users.models import DeliveryPartnerProfile
+from core.dispatch import enqueue
+from core.geo import delta_encode, encode_polyline, simplify_track
+from core.utils import TRANSIENT_FCM_ERRORS, send_delivery_notification
+from .models import DeliveryAssignment, LocationTrail, LocationUpdate
+
+@shared_task(autoretry_for=TRANSIENT_FCM_ERRORS, retry_backoff=True, max_retries=settings.NOTIFICATION_MAX_RETRIES)
+def notify_delivery_partner(order_id, notification_type):
+    """Push an assignment or status update to the order's delivery partner"""
+    order = Order.objects.select_related(
+        'store', 'delivery_assignment__delivery_partner'
+    ).filter(id=order_id).first()
+    if order is None:
+        return
+    send_delivery_notification(order, notification_type)
+
+@shared_task(autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=settings.NOTIFICATION_MAX_RETRIES)
+def persist_location_fixes(partner_id, fixes):
+    """Write-behind for location uploads: store ``[order_id, lat, lng, iso_timestamp]`` fixes
+    in the trail and move the partner profile to the newest one.
+
+    Fixes landing after their delivery was compressed get compressed into
+    the trail again instead of staying behind as raw rows.
+    """
+    updates = [
+        LocationUpdate(
+            delivery_partner_id=partner_id,
+            order_id=order_id,
+            latitude=Decimal(latitude),
+            longitude=Decimal(longitude),
+            timestamp=parse_datetime(timestamp),
+        )
+        for order_id, latitude, longitude, timestamp in fixes
+    ]
+    if not updates:
+        return
+
+    # One transaction, so a retry after a failure can't duplicate the trail
+    latest = max(updates, key=lambda update: update.timestamp)
+    with transaction.atomic():
+        # Locked so no delivery is marked between this check and the commit;
+        # one marked later compresses these rows itself
+        assignments = DeliveryAssignment.objects.select_for_update().filter(
+            order_id__in={update.order_id for update in updates},
+            delivery_partner_id=partner_id
+        ).values_list('id', 'delivered_at')
+        for assignment_id, delivered_at in assignments:
+            if delivered_at is not None:
+                enqueue(compress_location_trail, assignment_id)
+
+        LocationUpdate.objects.bulk_create(updates)
+        DeliveryPartnerProfile.objects.filter(user_id=partner_id).update(
+            current_latitude=latest.latitude,
+            current_longitude=latest.longitude
+        )
+
+@shared_task(autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=settings.NOTIFICATION_MAX_RETRIES)
+def compress_location_trail(assignment_id):
+    """Re-encode a delivered assignment's trail as a ``LocationTrail`` and delete its raw fixes.
+
+    Fixes within ``TRACKING_TRAIL_TOLERANCE_M`` of the simplified line are
+    dropped. Safe to run again: an existing trail is merged with any fixes
+    stored since (write-behind uploads can land after delivery, and
+    ``persist_location_fixes`` re-runs this task for them).
+    """
+    assignment = DeliveryAssignment.objects.filter(id=assignment_id).first()
+    if assignment is None:
+        return
+
+    with transaction.atomic():
+        raw = LocationUpdate.objects.filter(
+            order_id=assignment.order_id,
+            delivery_partner_id=assignment.delivery_partner_id
+        ).select_for_update()
+        rows = list(raw.order_by('timestamp').values_list('id', 'latitude', 'longitude', 'timestamp'))
+        if not rows:
+            return
+        fixes = [(float(latitude), float(longitude), timestamp) for _, latitude, longitude, timestamp in rows]
+
+        kept = simplify_track(fixes, settings.TRACKING_TRAIL_TOLERANCE_M)
+        raw_point_count = len(fixes)
+        trail = LocationTrail.objects.filter(assignment=assignment).first()
+        if trail:
+            # Already simplified points are kept as they are, not simplified twice
+            kept = sorted(trail.points() + kept, key=lambda fix: fix[2])
+            raw_point_count += trail.raw_point_count
+
+        started_at = kept[0][2]
+        LocationTrail.objects.update_or_create(assignment=assignment, defaults={
+            'polyline': encode_polyline([(lat, lng) for lat, lng, _ in kept], LocationTrail.PRECISION),
+            'timestamps': delta_encode([round((timestamp - started_at).total_seconds()) for _, _, timestamp in kept]),
+            'point_count': len(kept),
+            'raw_point_count': raw_point_count,
+            'started_at': started_at,
+            'ended_at': kept[-1][2],
+        })
+        # Only the rows compressed above; fixes stored meanwhile re-run this task
+        # from persist_location_fixes
+        LocationUpdate.objects.filter(id__in=[row[0] for row in rows]).delete()
@@ -0,0 +1,100 @@
+"""Latest known position of each delivery, kept in the Django cache.
+
+Both location upload endpoints write here; customer tracking polls read
+from here and only fall back to ``LocationUpdate`` after a cache miss (e.g.
+after a cache flush). The trail itself is persisted afterwards by the
+``persist_location_fixes`` task, off the request path.
+
+Every new position is also pushed to the order's channel-layer group, where
+``TrackingConsumer`` (apps/delivery/consumers.py) forwards it to customers
+watching the delivery over a WebSocket.
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.dateparse import parse_datetime
+from .models import LocationUpdate
+
+
+def _key(partner_id, order_id):
+    return f'tracking:position:{partner_id}:{order_id}'
+
+
+def get_position(partner_id, order_id):
+    """``{'latitude', 'longitude', 'timestamp'}`` or None"""
+    return cache.get(_key(partner_id, order_id))
+
+
+def group_name(order_id):
+    """Channel-layer group of everyone tracking ``order_id``"""
+    return f'tracking_{order_id}'
+
+
+def publish(order_id, message):
+    """Send ``message`` to the order's trackers; a channel layer outage must not fail an upload"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(group_name(order_id), message)
+    except Exception as e:
+        print(f"Error publishing tracking update for order {order_id}: {e}")
+
+
+def publish_status(order_id, status):
+    publish(order_id, {'type': 'tracking.status', 'status': status})
+
+
+def _position(latitude, longitude, timestamp):
+    return {
+        'latitude': float(latitude),
+        'longitude': float(longitude),
+        'timestamp': timestamp.isoformat(),
+    }
+
+
+def set_position(partner_id, order_id, latitude, longitude, timestamp):
+    """Remember a fix unless a newer one is already stored (uploads can arrive out of order).
+
+    A fix that becomes the latest position is pushed to the order's trackers
+    as a small delta.
+    """
+    position = _position(latitude, longitude, timestamp)
+    current = get_position(partner_id, order_id)
+    if current and parse_datetime(current['timestamp']) > timestamp:
+        return current
+    cache.set(_key(partner_id, order_id), position, settings.TRACKING_POSITION_TIMEOUT)
+    publish(order_id, {'type': 'tracking.position', 'position': position})
+    return position
+
+
+def record_fixes(partner_id, fixes):
+    """Store the newest of ``(order_id, latitude, longitude, timestamp)`` fixes per order"""
+    latest = {}
+    for fix in fixes:
+        if fix[0] not in latest or fix[3] > latest[fix[0]][3]:
+            latest[fix[0]] = fix
+    return {
+        order_id: set_position(partner_id, *fix)
+        for order_id, fix in latest.items()
+    }
+
+
+def latest_position(partner_id, order_id):
+    """Cached position, falling back to the newest persisted fix.
+
+    Fixes still in the write-behind queue are not in the table yet, so the
+    fallback is only cached briefly (and never over a fix an upload stored
+    meanwhile) to keep it from masking a newer position.
+    """
+    position = get_position(partner_id, order_id)
+    if position is None:
+        fix = LocationUpdate.objects.filter(
+            order_id=order_id,
+            delivery_partner_id=partner_id
+        ).order_by('-timestamp').values_list('latitude', 'longitude', 'timestamp').first()
+        if fix:
+            position = _position(*fix)
+            cache.add(_key(partner_id, order_id), position, settings.TRACKING_FALLBACK_TIMEOUT)
+    return position
@@ -8,12 +8,14 @@ from .views import (
     delivery_dashboard,
     update_availability,
     get_delivery_location,
+    batch_location_update,
 )
 
 urlpatterns = [
     path('assignments/', DeliveryAssignmentListView.as_view(), name='delivery-assignments'),
     path('assignments/<int:assignment_id>/status/', update_delivery_status, name='update-delivery-status'),
     path('location/', LocationUpdateView.as_view(), name='location-update'),
+    path('location/batch/', batch_location_update, name='location-batch-update'),
     path('earnings/', DeliveryEarningsView.as_view(), name='delivery-earnings'),
     path('dashboard/', delivery_dashboard, name='delivery-dashboard'),
     path('availability/', update_availability, name='update-availability'),
@@ -4,12 +4,17 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
-from .models import DeliveryAssignment, LocationUpdate, DeliveryEarnings
-from .serializers import DeliveryAssignmentSerializer, LocationUpdateSerializer, DeliveryEarningsSerializer
+from .models import DeliveryAssignment, DeliveryEarnings
+from .serializers import DeliveryAssignmentSerializer, LocationUpdateSerializer, DeliveryEarningsSerializer, LocationBatchSerializer
 from datetime import datetime, timedelta
+from decimal import Decimal
 from django.db.models import Sum
 from apps.orders.models import Order
-from core.utils import send_order_status_notification
+from core.pagination import KeysetPagination
+from core.dispatch import enqueue
+from apps.orders.tasks import notify_order_status
+from .tasks import compress_location_trail, persist_location_fixes
+from .tracking import latest_position, publish_status, record_fixes, set_position
 from .permissions import IsDeliveryPartner
 import googlemaps
 from django.conf import settings
@@ -76,16 +81,25 @@ class LocationUpdateView(generics.CreateAPIView):
 
             serializer = self.get_serializer(data=data)
             serializer.is_valid(raise_exception=True)
-            self.perform_create(serializer)
 
-            # Update delivery partner's current location
-            request.user.delivery_partner_profile.current_latitude = lat
-            request.user.delivery_partner_profile.current_longitude = lng
-            request.user.delivery_partner_profile.save()
+            # Serve trackers from the cache; the trail and the partner's
+            # current location are written behind by a background job
+            fix = serializer.validated_data
+            timestamp = timezone.now()
+            set_position(request.user.id, fix['order'].id, fix['latitude'], fix['longitude'], timestamp)
+            enqueue(persist_location_fixes, request.user.id, [
+                [fix['order'].id, str(fix['latitude']), str(fix['longitude']), timestamp.isoformat()]
+            ])
 
             return Response({
                 'message': 'Location updated successfully',
-                'data': serializer.data
+                'data': {
+                    'latitude': str(fix['latitude']),
+                    'longitude': str(fix['longitude']),
+                    'timestamp': timestamp.isoformat(),
+                    'delivery_partner': request.user.id,
+                    'order': fix['order'].id,
+                }
             }, status=status.HTTP_201_CREATED)
 
         except Exception as e:
@@ -94,6 +108,52 @@ class LocationUpdateView(generics.CreateAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+def _coordinate(value):
+    return Decimal(str(value)).quantize(Decimal('0.000001'))
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsDeliveryPartner])
+def batch_location_update(request):
+    """Store a batch of timestamped GPS fixes: {"fixes": [{order, latitude, longitude, timestamp}]}"""
+    serializer = LocationBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    fixes = serializer.validated_data['fixes']
+
+    # One ownership check for every order in the batch
+    order_ids = {fix['order'] for fix in fixes}
+    assigned = set(DeliveryAssignment.objects.filter(
+        delivery_partner=request.user,
+        order_id__in=order_ids
+    ).values_list('order_id', flat=True))
+    if order_ids - assigned:
+        return Response(
+            {'error': 'Order not assigned to this delivery partner',
+             'orders': sorted(order_ids - assigned)},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    # Fixes without a timestamp, or with one from the future, are stamped now
+    now = timezone.now()
+    rows = [
+        (fix['order'], _coordinate(fix['latitude']), _coordinate(fix['longitude']),
+         min(fix.get('timestamp') or now, now))
+        for fix in fixes
+    ]
+
+    # Serve trackers from the cache; the trail and the partner's current
+    # location are written behind by a background job
+    record_fixes(request.user.id, rows)
+    enqueue(persist_location_fixes, request.user.id, [
+        [order_id, str(latitude), str(longitude), timestamp.isoformat()]
+        for order_id, latitude, longitude, timestamp in rows
+    ])
+
+    return Response({
+        'message': 'Locations updated successfully',
+        'count': len(rows)
+    }, status=status.HTTP_201_CREATED)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsDeliveryPartner])
 def update_delivery_status(request, assignment_id):
@@ -179,7 +239,10 @@ def update_delivery_status(request, assignment_id):
         assignment.order.save()
 
         # Send notification to customer and admin
-        send_order_status_notification(assignment.order, status_update)
+        enqueue(notify_order_status, assignment.order_id, status_update)
+        publish_status(assignment.order_id, status_update)
+        if status_update == 'delivered':
+            enqueue(compress_location_trail, assignment.id)
 
         return Response({
             'status': 'updated',
@@ -202,6 +265,8 @@ def update_delivery_status(request, assignment_id):
 class DeliveryEarningsView(generics.ListAPIView):
     serializer_class = DeliveryEarningsSerializer
     permission_classes = (IsAuthenticated, IsDeliveryPartner)
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-earned_at', '-id')
 
     def get_queryset(self):
         return DeliveryEarnings.objects.filter(delivery_partner=self.request.user)
@@ -313,10 +378,8 @@ def get_delivery_location(request, order_id):
                 'delivery_partner', 'order'
             ).get(order=order)
 
-            latest_location = LocationUpdate.objects.filter(
-                order=order,
-                delivery_partner=assignment.delivery_partner
-            ).order_by('-timestamp').first()
+            # Served from the cache written by the location uploads
+            latest_location = latest_position(assignment.delivery_partner_id, order.id)
 
             if latest_location:
                 return Response({
@@ -324,11 +387,7 @@ def get_delivery_location(request, order_id):
                         'name': assignment.delivery_partner.username,
                         'phone': assignment.delivery_partner.phone_number
                     },
-                    'location':{
-                        'latitude': float(latest_location.latitude),
-                        'longitude': float(latest_location.longitude),
-                        'timestamp': latest_location.timestamp.isoformat(),
-                    },
+                    'location': latest_location,
                     'assignment_status': {
                         'picked_up': assignment.picked_up_at is not None,
                         'out_for_delivery': assignment.order.status == 'out_for_delivery',
@@ -389,10 +448,7 @@ def get_delivery_route(request, order_id):
         order = Order.objects.get(id=order_id, customer=request.user)
         assignment = DeliveryAssignment.objects.get(order=order)
 
-        latest_location = LocationUpdate.objects.filter(
-            order=order,
-            delivery_partner=assignment.delivery_partner
-        ).order_by('-timestamp').first()
+        latest_location = latest_position(assignment.delivery_partner_id, order.id)
 
         if not latest_location:
             return Response({'error': 'No location available'}
@@ -401,8 +457,8 @@ def get_delivery_route(request, order_id):
         gmaps = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
 
         directions_result = gmaps.directions(
-            origin=(float(latest_location.latitude),
-                    float(latest_location.longitude)),
+            origin=(latest_location['latitude'],
+                    latest_location['longitude']),
             destination=(float(order.delivery_latitude),
                          float(order.delivery_longitude)),
             mode="driving",
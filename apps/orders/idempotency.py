@@ -0,0 +1,84 @@
+"""``Idempotency-Key`` support for order placement.
+
+A client retrying ``POST /api/orders/create/`` with the same key gets the
+response of the first attempt replayed instead of a second order. Keys are
+scoped per user and remembered in the Django cache for
+``IDEMPOTENCY_KEY_TTL`` seconds; with several workers the cache must be
+shared (``REDIS_CACHE_URL``).
+
+The first request claims the key with ``cache.add`` (atomic), so a retry
+that arrives while the original is still running gets 409 instead of racing
+it. Only successful responses are remembered; after an error the key is
+released and the client may retry with it.
+"""
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+MAX_KEY_LENGTH = 255
+PENDING = 'pending'
+DONE = 'done'
+
+
+def _cache_key(user_id, key):
+    return f"idempotency:{user_id}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def fingerprint(data):
+    """Hash of the request body, to catch a key reused for a different request"""
+    body = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _stored_response(stored, request_fingerprint):
+    if stored['fingerprint'] != request_fingerprint:
+        return Response(
+            {'error': 'Idempotency-Key was already used for a different request'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if stored['state'] == PENDING:
+        return Response(
+            {'error': 'A request with this Idempotency-Key is still being processed'},
+            status=status.HTTP_409_CONFLICT
+        )
+    response = Response(stored['data'], status=stored['status'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent_response(request, key, handler):
+    """Return ``handler()``'s response, or the stored one if ``key`` was used before"""
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {'error': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    cache_key = _cache_key(request.user.pk, key)
+    request_fingerprint = fingerprint(request.data)
+    pending = {'state': PENDING, 'fingerprint': request_fingerprint}
+    while not cache.add(cache_key, pending, settings.IDEMPOTENCY_PENDING_TIMEOUT):
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return _stored_response(stored, request_fingerprint)
+        # Expired between add() and get(); try to claim it again
+
+    try:
+        response = handler()
+    except Exception:
+        cache.delete(cache_key)
+        raise
+
+    if status.is_success(response.status_code):
+        cache.set(cache_key, {
+            'state': DONE,
+            'fingerprint': request_fingerprint,
+            'status': response.status_code,
+            'data': dict(response.data),
+        }, settings.IDEMPOTENCY_KEY_TTL)
+    else:
+        cache.delete(cache_key)
+    return response
@@ -33,47 +33,75 @@ class CreateOrderSerializer(serializers.Serializer):
         request = self.context.get('request')
         if request and request.user:
             try:
-                address = Address.objects.get(id=value, user=request.user)
+                # Kept for the view so it doesn't fetch the address again
+                self.address = Address.objects.get(id=value, user=request.user)
                 return value
             except Address.DoesNotExist:
                 raise serializers.ValidationError("Address not found or doesn't belong to user")
         return value
 
     def validate_items(self, value):
-        """Validate items and calculate totals"""
+        """Validate items and calculate totals.
+
+        All products are fetched with one query. Errors are reported per cart
+        line as ``{line_index: [message]}``; repeated lines for the same
+        product are merged into one item.
+        """
         if not value:
             raise serializers.ValidationError("At least one item is required")
 
-        validated_items = []
-        total_amount = 0
-
-        for item in value:
+        errors = {}
+        lines = []
+        for index, item in enumerate(value):
             # ✅ Extract required fields (ignore optional ones like product_name, price, total)
-            product_id = item.get('product_id')
-            quantity = item.get('quantity', 1)
+            try:
+                product_id = int(item.get('product_id'))
+                quantity = int(item.get('quantity', 1))
+            except (TypeError, ValueError):
+                errors[index] = ["Invalid item data"]
+                continue
+            if product_id <= 0 or quantity <= 0:
+                errors[index] = ["Invalid item data"]
+                continue
+            lines.append((index, product_id, quantity))
 
-            if not product_id or quantity <= 0:
-                raise serializers.ValidationError("Invalid item data")
+        products = Product.objects.filter(is_available=True).select_related('store').in_bulk(
+            {product_id for _, product_id, _ in lines}
+        )
+        requested = {}
+        for _, product_id, quantity in lines:
+            requested[product_id] = requested.get(product_id, 0) + quantity
 
-            try:
-                product = Product.objects.get(id=product_id, is_available=True)
-                if quantity > product.stock_quantity:
-                    raise serializers.ValidationError(f"Insufficient stock for {product.name}")
+        store_id = None
+        for index, product_id, quantity in lines:
+            product = products.get(product_id)
+            if product is None:
+                errors[index] = [f"Product with id {product_id} not found"]
+            elif requested[product_id] > product.stock_quantity:
+                errors[index] = [f"Insufficient stock for {product.name}"]
+            elif store_id is None:
+                store_id = product.store_id
+            elif product.store_id != store_id:
+                errors[index] = ["All items must be from the same store"]
 
-                # ✅ Backend always uses database price (ignores client-sent price for security)
-                item_total = product.price * quantity
-                total_amount += item_total
+        if errors:
+            raise serializers.ValidationError(errors)
 
-                validated_items.append({
-                    'product': product,
-                    'quantity': quantity,
-                    'unit_price': product.price,  # ✅ Always from database
-                    'total_price': item_total     # ✅ Always calculated by backend
-                })
-            except Product.DoesNotExist:
-                raise serializers.ValidationError(f"Product with id {product_id} not found")
+        validated_items = []
+        total_amount = 0
+        for product_id, quantity in requested.items():
+            product = products[product_id]
+            # ✅ Backend always uses database price (ignores client-sent price for security)
+            item_total = product.price * quantity
+            total_amount += item_total
+            validated_items.append({
+                'product': product,
+                'quantity': quantity,
+                'unit_price': product.price,  # ✅ Always from database
+                'total_price': item_total     # ✅ Always calculated by backend
+            })
 
         # Store validated items for use in view
         self.validated_items = validated_items
         self.total_amount = total_amount
-        return value
\ No newline at end of file
+        return value
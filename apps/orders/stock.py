@@ -0,0 +1,57 @@
+"""Stock reservation for checkout.
+
+``reserve_stock`` must run inside ``transaction.atomic``. It locks the
+product rows of the order with one ``SELECT ... FOR UPDATE`` (in id order,
+so two checkouts sharing products always lock them in the same order and
+can't deadlock), then takes the stock with a single conditional ``UPDATE``.
+If any product is short nothing is decremented, and the caller's
+transaction is rolled back by the exception.
+"""
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from apps.products.models import Product
+
+
+class InsufficientStock(Exception):
+    def __init__(self, shortages):
+        # {product_id: quantity still available}
+        self.shortages = shortages
+        super().__init__(f"Insufficient stock for products {sorted(shortages)}")
+
+
+def reserve_stock(quantities):
+    """Decrement stock for ``{product_id: quantity}`` or raise ``InsufficientStock``"""
+    product_ids = sorted(quantities)
+    available = dict(
+        Product.objects.select_for_update()
+        .filter(id__in=product_ids, is_available=True)
+        .order_by('id')
+        .values_list('id', 'stock_quantity')
+    )
+    shortages = {
+        product_id: available.get(product_id, 0)
+        for product_id in product_ids
+        if available.get(product_id, 0) < quantities[product_id]
+    }
+    if shortages:
+        raise InsufficientStock(shortages)
+
+    # The stock_quantity >= quantity guard keeps this safe even where the
+    # database ignores FOR UPDATE; every row must match or none is taken.
+    condition = Q()
+    for product_id in product_ids:
+        condition |= Q(id=product_id, stock_quantity__gte=quantities[product_id])
+    decrement = Case(
+        *[When(id=product_id, then=Value(quantities[product_id])) for product_id in product_ids],
+        output_field=IntegerField(),
+    )
+    updated = Product.objects.filter(condition).update(
+        stock_quantity=F('stock_quantity') - decrement,
+        updated_at=timezone.now(),
+    )
+    if updated != len(product_ids):
+        current = dict(Product.objects.filter(id__in=product_ids).values_list('id', 'stock_quantity'))
+        raise InsufficientStock({
+            product_id: current.get(product_id, 0) for product_id in product_ids
+            if current.get(product_id, 0) < quantities[product_id]
+        })
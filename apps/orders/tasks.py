@@ -0,0 +1,12 @@
+from celery import shared_task
+from django.conf import settings
+from core.utils import TRANSIENT_FCM_ERRORS, send_order_status_notification
+from .models import Order
+
+@shared_task(autoretry_for=TRANSIENT_FCM_ERRORS, retry_backoff=True, max_retries=settings.NOTIFICATION_MAX_RETRIES)
+def notify_order_status(order_id, new_status):
+    """Push an order status change to the customer and admins"""
+    order = Order.objects.select_related('customer', 'store').filter(id=order_id).first()
+    if order is None:
+        return
+    send_order_status_notification(order, new_status)
@@ -3,17 +3,22 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
+from django.db import transaction
 from django.utils import timezone
 from .models import Order, OrderItem
+from .idempotency import idempotent_response
 from .serializers import OrderSerializer, CreateOrderSerializer
+from .stock import InsufficientStock, reserve_stock
+from .tasks import notify_order_status
 from apps.products.models import Product
-from apps.users.models import Address
-from core.utils import send_order_status_notification
+from core.pagination import KeysetPagination
+from core.dispatch import enqueue
 import uuid
 
 class OrderListView(generics.ListAPIView):
     serializer_class = OrderSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Order.objects.filter(customer=self.request.user)
@@ -30,6 +35,14 @@ class CreateOrderView(generics.CreateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def create(self, request, *args, **kwargs):
+        # Retries carrying the same Idempotency-Key get the first response back
+        if 'Idempotency-Key' in request.headers:
+            return idempotent_response(
+                request, request.headers['Idempotency-Key'], lambda: self.place_order(request)
+            )
+        return self.place_order(request)
+
+    def place_order(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
@@ -37,45 +50,53 @@ class CreateOrderView(generics.CreateAPIView):
         order_number = f"QK{uuid.uuid4().hex[:8].upper()}"
 
         # Get validated data from serializer
-        address_id = serializer.validated_data['address_id']
         notes = serializer.validated_data.get('notes', '')
         payment_method = serializer.validated_data.get('payment_method', 'COD').lower()  # ✅ Extract from request
 
         # Get address and determine store from items
-        address = Address.objects.get(id=address_id, user=request.user)
-        store = serializer.validated_items[0]['product'].store  # All items should be from same store
-
-        # Create order
-        order = Order.objects.create(
-            customer=request.user,
-            store=store,
-            order_number=order_number,
-            total_amount=serializer.total_amount,
-            delivery_address=f"{address.street}, {address.city}, {address.state} - {address.zip_code}",
-            delivery_latitude=address.latitude,
-            delivery_longitude=address.longitude,
-            payment_method=payment_method,  # ✅ Use from request (defaults to 'cod' if not provided)
-            status='placed'
-        )
-
-        # Create order items
-        for item_data in serializer.validated_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item_data['product'],
-                quantity=item_data['quantity'],
-                unit_price=item_data['unit_price'],
-                total_price=item_data['total_price']
-            )
-
-            # Update product stock
-            product = item_data['product']
-            product.stock_quantity -= item_data['quantity']
-            product.save()
+        address = serializer.address
+        store = serializer.validated_items[0]['product'].store  # Validation ensures a single store
+
+        quantities = {item_data['product'].id: item_data['quantity'] for item_data in serializer.validated_items}
+
+        try:
+            with transaction.atomic():
+                # Lock and decrement stock first so a failed reservation creates nothing
+                reserve_stock(quantities)
+
+                # Create order
+                order = Order.objects.create(
+                    customer=request.user,
+                    store=store,
+                    order_number=order_number,
+                    total_amount=serializer.total_amount,
+                    delivery_address=f"{address.street}, {address.city}, {address.state} - {address.zip_code}",
+                    delivery_latitude=address.latitude,
+                    delivery_longitude=address.longitude,
+                    payment_method=payment_method,  # ✅ Use from request (defaults to 'cod' if not provided)
+                    status='placed'
+                )
+
+                # Create order items
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order,
+                        product=item_data['product'],
+                        quantity=item_data['quantity'],
+                        unit_price=item_data['unit_price'],
+                        total_price=item_data['total_price']
+                    )
+                    for item_data in serializer.validated_items
+                ])
+
+                enqueue(notify_order_status, order.id, 'placed')
+        except InsufficientStock as error:
+            names = {item['product'].id: item['product'].name for item in serializer.validated_items}
+            return Response({
+                'error': f"Insufficient stock for {', '.join(names[pk] for pk in sorted(error.shortages))}",
+                'available': {str(pk): quantity for pk, quantity in error.shortages.items()},
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        # ✅ Refresh order from database to ensure items relationship is loaded
-        order.refresh_from_db()
-        send_order_status_notification(order, 'placed')
         return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
     
 @api_view(['POST'])
@@ -97,7 +118,7 @@ def update_order_status(request, order_id):
         order.save()
 
         if new_status in ['packed', 'out_for_delivery', 'delivered']:
-           send_order_status_notification(order, 'packed' if new_status == 'packed' else new_status)
+           enqueue(notify_order_status, order.id, new_status)
 
         return Response({
                 'message': f'Order status updated from {old_status} to {new_status}',
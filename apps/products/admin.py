@@ -10,7 +10,7 @@ class CategoryAdmin(admin.ModelAdmin):
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('name', 'store', 'category', 'price', 'stock_quantity', 'is_available')
     list_filter = ('is_available', 'category', 'store')
-    search_fields = ('name', 'description')
+    search_fields = ('name', 'sku', 'description')
 
     list_editable = ('stock_quantity', 'is_available')
 
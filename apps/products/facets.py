@@ -0,0 +1,117 @@
+"""Category and store facet counts for product listings.
+
+Every facet value (a category, a store, "available") has a posting bitmap:
+a Python int with bit ``n`` set when product ``n`` carries that value. The
+products matching the current filter are the AND of the selected bitmaps,
+and a facet count is ``(bitmap & matching).bit_count()``, so counting every
+category and store costs no queries.
+
+Counts are disjunctive: category counts ignore the category filter and
+store counts ignore the store filter, so a browse screen can show how many
+items the other choices would return.
+"""
+from django.conf import settings
+from core.memindex import InMemoryIndex
+from .models import Product
+
+
+def bitmap_from_ids(ids):
+    """Bitmap with a bit set for each id"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for product_id in ids:
+        buffer[product_id >> 3] |= 1 << (product_id & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class FacetIndex(InMemoryIndex):
+
+    def __init__(self):
+        super().__init__()
+        self.rebuild_interval = settings.PRODUCT_INDEX_REBUILD_INTERVAL
+        self.reset()
+
+    def reset(self):
+        self._categories = {}  # category_id -> bitmap
+        self._stores = {}  # store_id -> bitmap
+        self._available = 0
+        self._products = {}  # product_id -> (store_id, category_id, is_available)
+
+    def build(self):
+        categories, stores, available = {}, {}, []
+        rows = Product.objects.values_list('id', 'store_id', 'category_id', 'is_available')
+        for product_id, store_id, category_id, is_available in rows:
+            self._products[product_id] = (store_id, category_id, is_available)
+            categories.setdefault(category_id, []).append(product_id)
+            stores.setdefault(store_id, []).append(product_id)
+            if is_available:
+                available.append(product_id)
+
+        # Setting bits one at a time would copy the whole int for each product
+        self._categories = {key: bitmap_from_ids(ids) for key, ids in categories.items()}
+        self._stores = {key: bitmap_from_ids(ids) for key, ids in stores.items()}
+        self._available = bitmap_from_ids(available)
+
+    def _add(self, product_id, store_id, category_id, is_available):
+        bit = 1 << product_id
+        self._products[product_id] = (store_id, category_id, is_available)
+        self._categories[category_id] = self._categories.get(category_id, 0) | bit
+        self._stores[store_id] = self._stores.get(store_id, 0) | bit
+        if is_available:
+            self._available |= bit
+
+    def _remove(self, product_id):
+        previous = self._products.pop(product_id, None)
+        if previous is None:
+            return
+        store_id, category_id, _ = previous
+        mask = ~(1 << product_id)
+        self._available &= mask
+        for postings, key in ((self._stores, store_id), (self._categories, category_id)):
+            postings[key] &= mask
+            if not postings[key]:
+                del postings[key]
+
+    def update(self, product):
+        with self._lock:
+            if not self.is_built:
+                return
+            self._remove(product.pk)
+            self._add(product.pk, product.store_id, product.category_id, product.is_available)
+
+    def remove(self, product_id):
+        with self._lock:
+            if self.is_built:
+                self._remove(product_id)
+
+    @staticmethod
+    def _counts(postings, matching):
+        counts = []
+        for key, bitmap in postings.items():
+            count = (bitmap & matching).bit_count()
+            if count:
+                counts.append({'id': key, 'count': count})
+        counts.sort(key=lambda facet: (-facet['count'], facet['id']))
+        return counts
+
+    def facet_counts(self, store_id=None, category_id=None, ids=None):
+        """``{'categories': [...], 'stores': [...]}`` of ``{'id', 'count'}``
+        for available products, optionally restricted to ``ids`` (search hits)
+        """
+        self.ensure_built()
+        with self._lock:
+            matching = self._available
+            if ids is not None:
+                matching &= bitmap_from_ids(ids)
+
+            in_store = matching if store_id is None else matching & self._stores.get(store_id, 0)
+            in_category = matching if category_id is None else matching & self._categories.get(category_id, 0)
+            return {
+                'categories': self._counts(self._categories, in_store),
+                'stores': self._counts(self._stores, in_category),
+            }
+
+
+facet_index = FacetIndex()
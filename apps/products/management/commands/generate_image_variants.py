@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from apps.products.models import Category, Product
+from apps.stores.models import Store
+from core.images import generate_variants
+
+MODELS = {
+    'products': Product,
+    'categories': Category,
+    'stores': Store,
+}
+
+
+class Command(BaseCommand):
+    help = 'Generate resized image variants for existing product, category and store images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', choices=sorted(MODELS), action='append',
+            help='Only process this model (can be repeated); defaults to all'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Render variants again even if they already exist'
+        )
+
+    def handle(self, *args, **options):
+        for label in options['model'] or sorted(MODELS):
+            model = MODELS[label]
+            processed = failed = 0
+            queryset = model.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image')
+            for instance in queryset.iterator(chunk_size=500):
+                if generate_variants(instance.image.name, force=options['force'], storage=instance.image.storage):
+                    processed += 1
+                else:
+                    failed += 1
+
+            self.stdout.write(self.style.SUCCESS(f'{label}: {processed} images processed'))
+            if failed:
+                self.stdout.write(self.style.WARNING(f'{label}: {failed} images missing, unreadable or too small to resize'))
@@ -0,0 +1,201 @@
+import csv
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from apps.products.models import Category, Product
+from apps.stores.home import bump_home_version
+from apps.stores.models import Store
+
+REQUIRED_COLUMNS = ('sku', 'name', 'price', 'store', 'category')
+OPTIONAL_COLUMNS = ('description', 'unit', 'stock_quantity', 'is_available', 'image')
+MAX_PRICE = Decimal('99999999.99')  # max_digits=10, decimal_places=2
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'n'}
+
+
+class RowError(ValueError):
+    pass
+
+
+class LookupMap:
+    """Resolves a reference given as a primary key or a (case-insensitive) name"""
+
+    def __init__(self, label, rows):
+        self.label = label
+        self.ids = {}
+        self.names = {}
+        for pk, name in rows:
+            self.ids[str(pk)] = pk
+            key = name.strip().lower()
+            # The same name twice can't be resolved by name
+            self.names[key] = None if key in self.names else pk
+
+    def resolve(self, value):
+        value = str(value).strip()
+        if value in self.ids:
+            return self.ids[value]
+        key = value.lower()
+        if key not in self.names:
+            raise RowError(f'unknown {self.label} "{value}"')
+        if self.names[key] is None:
+            raise RowError(f'{self.label} name "{value}" is ambiguous, use its id')
+        return self.names[key]
+
+
+class Command(BaseCommand):
+    help = (
+        'Create or update products from a CSV or JSON Lines file, matched on sku. '
+        f'Columns: {", ".join(REQUIRED_COLUMNS)} (required), {", ".join(OPTIONAL_COLUMNS)}. '
+        'store and category may be ids or names.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or .jsonl file')
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'),
+            help='File format; guessed from the extension by default'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per upsert (default 2000)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without writing')
+        parser.add_argument(
+            '--max-errors', type=int, default=50,
+            help='Print at most this many invalid rows (all are counted)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        file_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        batch_size = max(1, options['batch_size'])
+
+        self.stores = LookupMap('store', Store.objects.values_list('id', 'name'))
+        self.categories = LookupMap('category', Category.objects.values_list('id', 'name'))
+        self.max_errors = options['max_errors']
+        self.error_count = 0
+
+        imported = 0
+        with open(path, newline='', encoding='utf-8-sig') as source:
+            rows = self.read_csv(source) if file_format == 'csv' else self.read_jsonl(source)
+            batch = {}
+            columns = None
+            for line_number, row in rows:
+                if columns is None:
+                    columns = set(row)
+                    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+                    if missing:
+                        raise CommandError(f'Missing required columns: {", ".join(missing)}')
+                    self.update_fields = [
+                        'store', 'category', 'name', 'price', 'updated_at',
+                        *[column for column in OPTIONAL_COLUMNS if column in columns],
+                    ]
+
+                try:
+                    product = self.build_product(row)
+                except RowError as error:
+                    self.report(line_number, error)
+                    continue
+
+                # Later rows for the same sku win, as they would applied one by one
+                batch[product.sku] = product
+                if len(batch) >= batch_size:
+                    imported += self.save_batch(batch.values(), options['dry_run'])
+                    batch = {}
+            if batch:
+                imported += self.save_batch(batch.values(), options['dry_run'])
+
+        if imported and not options['dry_run']:
+            bump_home_version()
+
+        verb = 'validated' if options['dry_run'] else 'imported'
+        self.stdout.write(self.style.SUCCESS(f'{imported} products {verb}, {self.error_count} rows rejected'))
+
+    def read_csv(self, source):
+        reader = csv.DictReader(source)
+        for row in reader:
+            yield reader.line_num, row
+
+    def read_jsonl(self, source):
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError('expected an object')
+            except ValueError as error:
+                self.report(line_number, f'invalid JSON ({error})')
+                continue
+            yield line_number, row
+
+    def report(self, line_number, error):
+        self.error_count += 1
+        if self.error_count <= self.max_errors:
+            self.stderr.write(f'line {line_number}: {error}')
+
+    def build_product(self, row):
+        values = {}
+        for column in REQUIRED_COLUMNS:
+            value = row.get(column)
+            if value is None or str(value).strip() == '':
+                raise RowError(f'{column} is required')
+            values[column] = str(value).strip()
+
+        if len(values['sku']) > 64:
+            raise RowError('sku is longer than 64 characters')
+        if len(values['name']) > 100:
+            raise RowError('name is longer than 100 characters')
+
+        try:
+            price = Decimal(values['price']).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            raise RowError(f'invalid price "{values["price"]}"')
+        if not price.is_finite():
+            raise RowError(f'invalid price "{values["price"]}"')
+        if not Decimal(0) <= price <= MAX_PRICE:
+            raise RowError(f'price {price} is out of range')
+
+        product = Product(
+            sku=values['sku'],
+            name=values['name'],
+            price=price,
+            store_id=self.stores.resolve(values['store']),
+            category_id=self.categories.resolve(values['category']),
+            description=str(row.get('description') or ''),
+        )
+
+        if row.get('unit') not in (None, ''):
+            product.unit = str(row['unit']).strip()[:20]
+        if row.get('image') not in (None, ''):
+            product.image = str(row['image']).strip()
+        if row.get('stock_quantity') not in (None, ''):
+            try:
+                product.stock_quantity = int(row['stock_quantity'])
+            except (TypeError, ValueError):
+                raise RowError(f'invalid stock_quantity "{row["stock_quantity"]}"')
+            if product.stock_quantity < 0:
+                raise RowError('stock_quantity cannot be negative')
+        if row.get('is_available') not in (None, ''):
+            flag = str(row['is_available']).strip().lower()
+            if flag not in TRUE_VALUES | FALSE_VALUES:
+                raise RowError(f'invalid is_available "{row["is_available"]}"')
+            product.is_available = flag in TRUE_VALUES
+        return product
+
+    def save_batch(self, products, dry_run):
+        products = list(products)
+        if dry_run:
+            return len(products)
+
+        # MySQL upserts on any unique key and rejects an explicit conflict target
+        unique_fields = ['sku'] if connection.features.supports_update_conflicts_with_target else None
+        with transaction.atomic():
+            Product.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=self.update_fields,
+            )
+        return len(products)
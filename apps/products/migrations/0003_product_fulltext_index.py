@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 17:05
+
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'CREATE FULLTEXT INDEX product_name_desc_ft ON products_product (name, description)'
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX product_name_desc_ft ON products_product')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_category_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
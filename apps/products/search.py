@@ -0,0 +1,365 @@
+"""Product search backends.
+
+``ProductListView`` hands its (already filtered) queryset to the configured
+backend, which returns it restricted to matching products and ordered by
+relevance. The default backend keeps an in-process inverted index with BM25
+ranking; ``DatabaseSearchBackend`` uses a MySQL FULLTEXT index when the
+database supports it. Select one with ``PRODUCT_SEARCH_BACKEND``.
+"""
+import bisect
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from core.memindex import InMemoryIndex
+from .models import Product
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Lowercase and strip accents so 'Café' and 'cafe' match"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text))
+
+
+def order_by_ids(queryset, ids):
+    """Restrict a queryset to ``ids`` and keep their order"""
+    if not ids:
+        return queryset.none()
+    ranking = Case(*[When(pk=pk, then=position) for position, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(pk__in=ids).order_by(ranking)
+
+
+class SearchBackend:
+    """Interface for product search backends"""
+
+    def search(self, queryset, query, store_id=None, category_id=None):
+        """Return ``queryset`` narrowed to products matching ``query``, best match first"""
+        raise NotImplementedError
+
+    def matching_ids(self, queryset, query):
+        """IDs of every product in ``queryset`` matching ``query``, without the result limit (for facet counts)"""
+        return self.search(queryset, query).values_list('id', flat=True)
+
+    def update(self, product):
+        """Called after a product is saved"""
+
+    def remove(self, product_id):
+        """Called after a product is deleted"""
+
+
+class InvertedIndexBackend(InMemoryIndex, SearchBackend):
+    """In-process inverted index over product names and descriptions.
+
+    Postings map each token to ``{product_id: weighted term frequency}``; name
+    tokens count ``NAME_WEIGHT`` times so name matches outrank description
+    matches. Every query term must match, the last one as a prefix so results
+    keep up while the customer is still typing. Store and category filters are
+    applied to the postings before ranking.
+    """
+    NAME_WEIGHT = 3
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        super().__init__()
+        self.rebuild_interval = settings.PRODUCT_INDEX_REBUILD_INTERVAL
+        self.reset()
+
+    def reset(self):
+        self._postings = defaultdict(dict)
+        self._vocabulary = []
+        self._docs = {}  # product_id -> (length, store_id, category_id, tokens)
+        self._total_length = 0
+
+    def build(self):
+        rows = Product.objects.filter(is_available=True).values_list(
+            'id', 'name', 'description', 'store_id', 'category_id'
+        )
+        for row in rows:
+            self._add(*row, keep_sorted=False)
+        self._vocabulary = sorted(self._postings)
+
+    def _add(self, product_id, name, description, store_id, category_id, keep_sorted=True):
+        frequencies = defaultdict(int)
+        for token in tokenize(name):
+            frequencies[token] += self.NAME_WEIGHT
+        for token in tokenize(description):
+            frequencies[token] += 1
+
+        length = sum(frequencies.values())
+        for token, frequency in frequencies.items():
+            # A full build sorts the vocabulary once at the end; inserting
+            # every new token here would make a rebuild quadratic
+            if keep_sorted and token not in self._postings:
+                bisect.insort(self._vocabulary, token)
+            self._postings[token][product_id] = frequency
+        self._docs[product_id] = (length, store_id, category_id, tuple(frequencies))
+        self._total_length += length
+
+    def _remove(self, product_id):
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        self._total_length -= doc[0]
+        for token in doc[3]:
+            postings = self._postings[token]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                position = bisect.bisect_left(self._vocabulary, token)
+                if position < len(self._vocabulary) and self._vocabulary[position] == token:
+                    del self._vocabulary[position]
+
+    def update(self, product):
+        with self._lock:
+            if not self.is_built:
+                return
+            self._remove(product.pk)
+            if product.is_available:
+                self._add(product.pk, product.name, product.description, product.store_id, product.category_id)
+
+    def remove(self, product_id):
+        with self._lock:
+            if self.is_built:
+                self._remove(product_id)
+
+    def _prefix_tokens(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + '\uffff')
+        return self._vocabulary[start:end]
+
+    def _term_scores(self, tokens, average_length, allowed):
+        """BM25 contribution per product for a group of alternative tokens"""
+        doc_count = len(self._docs)
+        scores = defaultdict(float)
+        for token in tokens:
+            postings = self._postings.get(token, {})
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for product_id, frequency in postings.items():
+                if allowed is not None and not allowed(product_id):
+                    continue
+                length = self._docs[product_id][0]
+                norm = frequency + self.K1 * (1 - self.B + self.B * length / average_length)
+                scores[product_id] = max(scores[product_id], idf * frequency * (self.K1 + 1) / norm)
+        return scores
+
+    def ranked_ids(self, query, store_id=None, category_id=None, limit=None):
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        self.ensure_built()
+        with self._lock:
+            if not self._docs:
+                return []
+            average_length = self._total_length / len(self._docs)
+
+            allowed = None
+            if store_id is not None or category_id is not None:
+                def allowed(product_id):
+                    _, doc_store, doc_category, _ = self._docs[product_id]
+                    return (store_id is None or doc_store == store_id) and \
+                        (category_id is None or doc_category == category_id)
+
+            totals = None
+            for position, term in enumerate(terms):
+                is_last = position == len(terms) - 1
+                alternatives = self._prefix_tokens(term) if is_last else [term]
+                scores = self._term_scores(alternatives, average_length, allowed)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {pk: totals[pk] + score for pk, score in scores.items() if pk in totals}
+                if not totals:
+                    return []
+
+        ranked = sorted(totals, key=lambda pk: (-totals[pk], pk))
+        return ranked[:limit] if limit else ranked
+
+    def search(self, queryset, query, store_id=None, category_id=None):
+        ids = self.ranked_ids(
+            query,
+            store_id=int(store_id) if store_id else None,
+            category_id=int(category_id) if category_id else None,
+            limit=settings.PRODUCT_SEARCH_RESULT_LIMIT,
+        )
+        return order_by_ids(queryset, ids)
+
+    def matching_ids(self, queryset, query):
+        return self.ranked_ids(query)
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """Uses the MySQL FULLTEXT index on (name, description) when available.
+
+    Other databases fall back to the original ``icontains`` filter.
+    """
+
+    def search(self, queryset, query, store_id=None, category_id=None):
+        if connection.vendor != 'mysql':
+            return queryset.filter(Q(name__icontains=query) | Q(description__icontains=query))
+
+        table = Product._meta.db_table
+        relevance = RawSQL(
+            f'MATCH (`{table}`.`name`, `{table}`.`description`) AGAINST (%s IN NATURAL LANGUAGE MODE)',
+            (query,),
+        )
+        return queryset.annotate(relevance=relevance).filter(relevance__gt=0).order_by('-relevance', 'pk')
+
+
+def trigrams(word):
+    """pg_trgm style trigrams: the word padded with two leading and one trailing space"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex(InMemoryIndex, SearchBackend):
+    """Typo-tolerant matching of product names.
+
+    Each distinct word in product names is indexed by its trigrams. A query
+    word is matched against that (much smaller) vocabulary with Jaccard
+    similarity, e.g. "tomatoe" still finds "tomato". A product matches when
+    every query word has a similar word in its name, and is scored by the
+    summed similarities.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rebuild_interval = settings.PRODUCT_INDEX_REBUILD_INTERVAL
+        self.threshold = settings.PRODUCT_FUZZY_THRESHOLD
+        self.reset()
+
+    def reset(self):
+        self._trigram_words = defaultdict(set)  # trigram -> words
+        self._word_trigrams = {}  # word -> frozenset of trigrams
+        self._word_products = defaultdict(set)  # word -> product ids
+        self._docs = {}  # product_id -> (store_id, category_id, words)
+
+    def build(self):
+        self.load(Product.objects.filter(is_available=True).values_list('id', 'name', 'store_id', 'category_id'))
+
+    def load(self, rows):
+        for row in rows:
+            self._add(*row)
+
+    def _add(self, product_id, name, store_id, category_id):
+        words = frozenset(tokenize(name))
+        for word in words:
+            if word not in self._word_trigrams:
+                grams = frozenset(trigrams(word))
+                self._word_trigrams[word] = grams
+                for gram in grams:
+                    self._trigram_words[gram].add(word)
+            self._word_products[word].add(product_id)
+        self._docs[product_id] = (store_id, category_id, words)
+
+    def _remove(self, product_id):
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        for word in doc[2]:
+            products = self._word_products[word]
+            products.discard(product_id)
+            if products:
+                continue
+            del self._word_products[word]
+            for gram in self._word_trigrams.pop(word):
+                words = self._trigram_words[gram]
+                words.discard(word)
+                if not words:
+                    del self._trigram_words[gram]
+
+    def update(self, product):
+        with self._lock:
+            if not self.is_built:
+                return
+            self._remove(product.pk)
+            if product.is_available:
+                self._add(product.pk, product.name, product.store_id, product.category_id)
+
+    def remove(self, product_id):
+        with self._lock:
+            if self.is_built:
+                self._remove(product_id)
+
+    def similar_words(self, word):
+        """``{indexed_word: similarity}`` for words at or above the threshold"""
+        query = trigrams(word)
+        # A match must share at least ceil(threshold * |query|) trigrams, so it
+        # has to appear among the rarest |query| - that + 1 posting lists.
+        required = max(1, math.ceil(self.threshold * len(query)))
+        postings = sorted(
+            (self._trigram_words.get(gram, ()) for gram in query), key=len
+        )[:len(query) - required + 1]
+
+        candidates = set().union(*postings)
+        matches = {}
+        for candidate in candidates:
+            grams = self._word_trigrams[candidate]
+            shared = len(query & grams)
+            similarity = shared / (len(query) + len(grams) - shared)
+            if similarity >= self.threshold:
+                matches[candidate] = similarity
+        return matches
+
+    def ranked_ids(self, query, store_id=None, category_id=None, limit=None):
+        words = tokenize(query)
+        if not words:
+            return []
+
+        self.ensure_built()
+        with self._lock:
+            totals = None
+            for word in words:
+                scores = defaultdict(float)
+                for match, similarity in self.similar_words(word).items():
+                    for product_id in self._word_products[match]:
+                        scores[product_id] = max(scores[product_id], similarity)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {pk: totals[pk] + score for pk, score in scores.items() if pk in totals}
+                if not totals:
+                    return []
+
+            if store_id is not None or category_id is not None:
+                totals = {
+                    pk: score for pk, score in totals.items()
+                    if (store_id is None or self._docs[pk][0] == store_id)
+                    and (category_id is None or self._docs[pk][1] == category_id)
+                }
+
+        ranked = sorted(totals, key=lambda pk: (-totals[pk], pk))
+        return ranked[:limit] if limit else ranked
+
+    def search(self, queryset, query, store_id=None, category_id=None):
+        ids = self.ranked_ids(
+            query,
+            store_id=int(store_id) if store_id else None,
+            category_id=int(category_id) if category_id else None,
+            limit=settings.PRODUCT_SEARCH_RESULT_LIMIT,
+        )
+        return order_by_ids(queryset, ids)
+
+    def matching_ids(self, queryset, query):
+        return self.ranked_ids(query)
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    return import_string(settings.PRODUCT_SEARCH_BACKEND)()
+
+
+fuzzy_index = TrigramIndex()
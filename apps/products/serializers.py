@@ -1,15 +1,20 @@
 from rest_framework import serializers
 from .models import Category, Product
 from django.conf import settings
+from core.images import image_variants
 
 class CategorySerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     def get_image(self, obj):
         if obj.image:
             return f"{settings.SITE_URL}{settings.MEDIA_URL}{obj.image}"
         return None
 
+    def get_image_variants(self, obj):
+        return image_variants(obj.image)
+
     class Meta:
         model = Category
         fields = '__all__'
@@ -18,12 +23,16 @@ class ProductSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     store_name = serializers.CharField(source='store.name', read_only=True)
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     def get_image(self, obj):
         if obj.image:
             return f"{settings.SITE_URL}{settings.MEDIA_URL}{obj.image}"
         return None
 
+    def get_image_variants(self, obj):
+        return image_variants(obj.image)
+
     class Meta:
         model = Product
         fields = '__all__'
\ No newline at end of file
@@ -0,0 +1,45 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from core.images import queue_variants, stored_image_name
+from .facets import facet_index
+from .models import Category, Product
+from .search import fuzzy_index, get_search_backend
+from .suggest import suggest_index
+
+@receiver(post_save, sender=Product)
+def update_search_index_on_save(sender, instance, **kwargs):
+    """Keep the product search indexes in sync with saved products"""
+    get_search_backend().update(instance)
+    fuzzy_index.update(instance)
+    suggest_index.update_product(instance)
+    facet_index.update(instance)
+
+@receiver(post_delete, sender=Product)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    """Drop deleted products from the search indexes"""
+    get_search_backend().remove(instance.pk)
+    fuzzy_index.remove(instance.pk)
+    suggest_index.remove_product(instance.pk)
+    facet_index.remove(instance.pk)
+
+@receiver(post_save, sender=Category)
+def update_suggestions_on_category_save(sender, instance, **kwargs):
+    """Keep category names in the autocomplete index"""
+    suggest_index.update_category(instance)
+
+@receiver(post_delete, sender=Category)
+def update_suggestions_on_category_delete(sender, instance, **kwargs):
+    suggest_index.remove_category(instance.pk)
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=Category)
+def remember_previous_image(sender, instance, **kwargs):
+    """Keep the stored image name so an unchanged image isn't rendered again"""
+    instance._previous_image = stored_image_name(instance)
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+def generate_image_variants(sender, instance, **kwargs):
+    """Render resized variants of a newly uploaded image"""
+    if instance.image and instance.image.name != getattr(instance, '_previous_image', None):
+        queue_variants(instance.image.name)
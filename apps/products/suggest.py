@@ -0,0 +1,176 @@
+"""Prefix autocomplete over product and category names.
+
+Every distinct name is one suggestion. Each word start of a name is stored
+as a key in a single sorted list, so "milk" completes both "Milk Bread" and
+"Amul Milk"; a prefix lookup is two bisects plus a top-k pick over the
+matching slice. Suggestions are weighted by how often their products have
+been ordered. Results for one- and two-letter prefixes, whose slices are the
+largest, are memoized until the index changes.
+"""
+import bisect
+import heapq
+from django.conf import settings
+from django.db.models import Count
+from apps.orders.models import OrderItem
+from core.memindex import InMemoryIndex
+from .models import Category, Product
+from .search import tokenize
+
+PRODUCT = 'product'
+CATEGORY = 'category'
+
+
+def _label_key(kind, name):
+    return kind, ' '.join(tokenize(name))
+
+
+def _word_start_keys(label_key):
+    """Sorted-list keys for a label: its name from each word onwards"""
+    kind, normalized = label_key
+    word_starts = [0] + [i + 1 for i, char in enumerate(normalized) if char == ' ']
+    return [(normalized[start:], kind, normalized) for start in word_starts]
+
+
+class SuggestIndex(InMemoryIndex):
+    memoized_prefix_length = 2
+
+    def __init__(self):
+        super().__init__()
+        self.rebuild_interval = settings.PRODUCT_INDEX_REBUILD_INTERVAL
+        self.reset()
+
+    def reset(self):
+        self._keys = []  # sorted (word_start_suffix, kind, normalized_name)
+        self._labels = {}  # (kind, normalized_name) -> [display_name, weight, members]
+        self._products = {}  # product_id -> ((kind, normalized_name), weight)
+        self._categories = {}  # category_id -> (kind, normalized_name)
+        self._memo = {}
+
+    def build(self):
+        popularity = dict(
+            OrderItem.objects.values_list('product_id').annotate(orders=Count('id')).order_by()
+        )
+        category_weights = {}
+        rows = Product.objects.filter(is_available=True).values_list('id', 'name', 'category_id')
+        for product_id, name, category_id in rows:
+            weight = popularity.get(product_id, 0)
+            category_weights[category_id] = category_weights.get(category_id, 0) + weight
+            self._add_product(product_id, name, weight)
+
+        for category_id, name in Category.objects.filter(is_active=True).values_list('id', 'name'):
+            self._add_category(category_id, name, category_weights.get(category_id, 0))
+
+        self._keys.sort()
+
+    def _add_label(self, label_key, display, weight):
+        label = self._labels.get(label_key)
+        if label is None:
+            self._labels[label_key] = [display, weight, 1]
+            for key in _word_start_keys(label_key):
+                if self.is_built:
+                    bisect.insort(self._keys, key)
+                else:
+                    self._keys.append(key)
+        else:
+            label[1] += weight
+            label[2] += 1
+
+    def _remove_label(self, label_key, weight):
+        label = self._labels.get(label_key)
+        if label is None:
+            return
+        label[1] -= weight
+        label[2] -= 1
+        if label[2]:
+            return
+        del self._labels[label_key]
+        for key in _word_start_keys(label_key):
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    def _add_product(self, product_id, name, weight):
+        label_key = _label_key(PRODUCT, name)
+        if not label_key[1]:
+            return
+        self._products[product_id] = (label_key, weight)
+        self._add_label(label_key, name.strip(), weight)
+
+    def _add_category(self, category_id, name, weight):
+        label_key = _label_key(CATEGORY, name)
+        if not label_key[1]:
+            return
+        self._categories[category_id] = label_key
+        self._add_label(label_key, name.strip(), weight)
+
+    def update_product(self, product):
+        with self._lock:
+            if not self.is_built:
+                return
+            previous = self._products.pop(product.pk, None)
+            weight = previous[1] if previous else 0
+            if previous:
+                self._remove_label(*previous)
+            if product.is_available:
+                self._add_product(product.pk, product.name, weight)
+            self._memo.clear()
+
+    def remove_product(self, product_id):
+        with self._lock:
+            if not self.is_built:
+                return
+            previous = self._products.pop(product_id, None)
+            if previous:
+                self._remove_label(*previous)
+            self._memo.clear()
+
+    def update_category(self, category):
+        with self._lock:
+            if not self.is_built:
+                return
+            previous = self._categories.pop(category.pk, None)
+            weight = self._labels[previous][1] if previous in self._labels else 0
+            if previous:
+                self._remove_label(previous, weight)
+            if category.is_active:
+                self._add_category(category.pk, category.name, weight)
+            self._memo.clear()
+
+    def remove_category(self, category_id):
+        with self._lock:
+            if not self.is_built:
+                return
+            previous = self._categories.pop(category_id, None)
+            if previous in self._labels:
+                self._remove_label(previous, self._labels[previous][1])
+            self._memo.clear()
+
+    def suggest(self, query, limit=10):
+        """Top ``limit`` ``{'text', 'type'}`` completions for a prefix"""
+        prefix = ' '.join(tokenize(query))
+        if query[-1:].isspace() and prefix:
+            prefix += ' '
+        if not prefix:
+            return []
+
+        self.ensure_built()
+        with self._lock:
+            memo_key = (prefix, limit)
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+
+            start = bisect.bisect_left(self._keys, (prefix,))
+            end = bisect.bisect_left(self._keys, (prefix + '\uffff',))
+            label_keys = {key[1:] for key in self._keys[start:end]}
+            best = heapq.nsmallest(
+                limit, label_keys,
+                key=lambda label_key: (-self._labels[label_key][1], len(label_key[1]), label_key)
+            )
+            results = [{'text': self._labels[key][0], 'type': key[0]} for key in best]
+
+            if len(prefix) <= self.memoized_prefix_length:
+                self._memo[memo_key] = results
+            return results
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,23 @@
+from celery import shared_task
+from django.utils import timezone
+from apps.stores.home import bump_home_version
+from apps.stores.models import Store
+from core.images import generate_variants, known_variants
+from .models import Category, Product
+
+@shared_task
+def render_image_variants(name):
+    """Render resized variants of an uploaded image (see core/images.py).
+
+    Responses built before the render point at the original. When the
+    rendered variants differ from those, the rows showing the image are
+    touched so their ETags and the home payload change and clients pick up
+    the variant URLs.
+    """
+    served = known_variants(name) or {}
+    if generate_variants(name) == served:
+        return
+    now = timezone.now()
+    for model in (Product, Category, Store):
+        model.objects.filter(image=name).update(updated_at=now)
+    bump_home_version()
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import CategoryListView, ProductListView, ProductDetailView
+from .views import CategoryListView, ProductListView, ProductDetailView, suggest_view
 
 urlpatterns = [
     path('categories/', CategoryListView.as_view(), name='category-list'),
     path('', ProductListView.as_view(), name='product-list'),
+    path('suggest/', suggest_view, name='product-suggest'),
     path('<int:pk>/', ProductDetailView.as_view(), name='product-detail'),
 ]
\ No newline at end of file
@@ -1,13 +1,19 @@
+import json
 from django.shortcuts import render
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes
 from .models import Product, Category
 from .serializers import ProductSerializer, CategorySerializer
-from django.db.models import Q
+from .facets import facet_index
+from .search import fuzzy_index, get_search_backend
+from .suggest import suggest_index
+from core.conditional import ConditionalGetMixin
+from core.pagination import KeysetPagination
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(ConditionalGetMixin, generics.ListAPIView):
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = (IsAuthenticated,)
@@ -17,12 +23,26 @@ class ProductPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class ProductListView(generics.ListAPIView):
+class ProductKeysetPagination(KeysetPagination):
+    fallback_class = ProductPagination
+
+    def use_fallback(self, request, view):
+        # Search results are ordered by relevance, which has no keyset
+        return super().use_fallback(request, view) or bool(request.query_params.get('search'))
+
+class ProductListView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = ProductSerializer
     permission_classes = (IsAuthenticated,)
-    pagination_class = ProductPagination
+    pagination_class = ProductKeysetPagination
+    validator_fields = ('updated_at', 'store__updated_at', 'category__updated_at')
 
     def get_queryset(self):
+        # Validators and the listing both ask for the queryset; only search once
+        if not hasattr(self, '_queryset'):
+            self._queryset = self._build_queryset()
+        return self._queryset
+
+    def _build_queryset(self):
         queryset = Product.objects.filter(is_available=True).select_related('store', 'category')
 
         # Filter by store
@@ -35,27 +55,82 @@ class ProductListView(generics.ListAPIView):
         if category_id:
             queryset = queryset.filter(category_id=category_id)
 
-        # Search by name or description
+        # Search by name or description; fuzzy=1 tolerates typos in names
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | Q(description__icontains=search)
+            queryset = self.get_search_backend().search(
+                queryset, search, store_id=store_id, category_id=category_id
             )
 
         return queryset
 
+    def get_search_backend(self):
+        return fuzzy_index if self.request.query_params.get('fuzzy') == '1' else get_search_backend()
+
+    def wants_facets(self):
+        return self.request.query_params.get('facets') == '1'
+
+    def get_validator_salt(self):
+        salt = super().get_validator_salt()
+        if self.wants_facets():
+            # Facet counts cover products outside this list (other stores and
+            # categories), so the ETag has to change when they do
+            salt += json.dumps(self.get_facets(), sort_keys=True)
+        return salt
+
+    def get_facets(self):
+        """Category and store counts for the current filters (?facets=1)"""
+        # Validators and the response both need the counts; only count once
+        if not hasattr(self, '_facets'):
+            self._facets = self._count_facets()
+        return self._facets
+
+    def _count_facets(self):
+        store_id = self.request.query_params.get('store')
+        category_id = self.request.query_params.get('category')
+        search = self.request.query_params.get('search')
+
+        # Counts for the other stores/categories need every unfiltered search
+        # hit, not just the PRODUCT_SEARCH_RESULT_LIMIT best ones
+        ids = None
+        if search:
+            ids = self.get_search_backend().matching_ids(
+                Product.objects.filter(is_available=True), search
+            )
+
+        return facet_index.facet_counts(
+            store_id=int(store_id) if store_id else None,
+            category_id=int(category_id) if category_id else None,
+            ids=ids,
+        )
+
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         page = self.paginate_queryset(queryset)
 
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        if self.wants_facets() and isinstance(response.data, dict):
+            response.data['facets'] = self.get_facets()
+        return response
 
-class ProductDetailView(generics.RetrieveAPIView):
+class ProductDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Product.objects.filter(is_available=True).select_related('store', 'category')
     serializer_class = ProductSerializer
-    permission_classes = (IsAuthenticated,)
\ No newline at end of file
+    permission_classes = (IsAuthenticated,)
+    validator_fields = ('updated_at', 'store__updated_at', 'category__updated_at')
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def suggest_view(request):
+    """Autocomplete product and category names for the search box"""
+    query = request.query_params.get('q', '')
+    return Response({
+        'query': query,
+        'suggestions': suggest_index.suggest(query),
+    })
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class StoresConfig(AppConfig):
     name = 'apps.stores'
+
+    def ready(self):
+        import apps.stores.signals
@@ -0,0 +1,110 @@
+"""Versioned, pre-rendered payload for the home screen.
+
+The home JSON is the same for every customer, so it is rendered once and
+cached under the current home version. Any change to stores, banners,
+categories or products bumps the version (see signals.py) and rebuilds the
+payload in a background thread, so app launches keep hitting the cache.
+
+The version bump only reaches other workers through a shared cache
+(``REDIS_CACHE_URL``). With the per-process LocMem cache each worker keeps
+its own version, so payloads there live only ``HOME_PAYLOAD_LOCAL_TIMEOUT``
+seconds and changes made elsewhere show up after at most that long.
+"""
+import hashlib
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+from core.caching import cache_timeout
+from apps.products.models import Category, Product
+from .models import Store, Banner
+from .serializers import HomeResponseSerializer
+
+VERSION_KEY = 'home:version'
+
+
+def _payload_key(version):
+    return f'home:payload:{version}'
+
+
+def _initial_version():
+    # Time based, so a version key lost to eviction never reuses an old payload key
+    return int(time.time() * 1000)
+
+
+def get_home_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _initial_version(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def build_home_payload():
+    """Render the home JSON; returns ``{'etag', 'last_modified', 'content'}``"""
+    stores = Store.objects.filter(is_active=True)[:20]
+    banners = Banner.objects.filter(is_active=True)
+    categories = Category.objects.filter(is_active=True)
+    featured_products = Product.objects.filter(
+        is_available=True,
+        store__is_active=True
+    ).select_related('store', 'category').order_by('-created_at')[:12]
+
+    response_data = {
+        'stores': stores,
+        'categories': categories,
+        'banners': banners,
+        'products': featured_products,
+    }
+    content = JSONRenderer().render(HomeResponseSerializer(response_data).data)
+    return {
+        'etag': f'"{hashlib.md5(content).hexdigest()}"',
+        'last_modified': time.time(),
+        'content': content,
+    }
+
+
+def get_home_payload():
+    key = _payload_key(get_home_version())
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_home_payload()
+        cache.set(key, payload, cache_timeout(settings.HOME_PAYLOAD_TIMEOUT, settings.HOME_PAYLOAD_LOCAL_TIMEOUT))
+    return payload
+
+
+_rebuild_lock = threading.Lock()
+_rebuild_requested = threading.Event()
+
+
+def _rebuild_in_background():
+    # Bulk admin edits fire one signal per row; coalesce them into one rebuild.
+    # Anything missed here is rebuilt on the next cache miss.
+    _rebuild_requested.set()
+    if not _rebuild_lock.acquire(blocking=False):
+        return
+
+    def rebuild():
+        try:
+            while _rebuild_requested.is_set():
+                _rebuild_requested.clear()
+                get_home_payload()
+        finally:
+            connection.close()
+            _rebuild_lock.release()
+
+    threading.Thread(target=rebuild, daemon=True).start()
+
+
+def bump_home_version():
+    """Invalidate the cached home payload once the current transaction commits"""
+    def bump():
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, _initial_version(), None)
+        _rebuild_in_background()
+
+    transaction.on_commit(bump)
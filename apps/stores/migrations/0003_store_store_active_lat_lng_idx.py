@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_banner'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='store',
+            index=models.Index(fields=['is_active', 'latitude', 'longitude'], name='store_active_lat_lng_idx'),
+        ),
+    ]
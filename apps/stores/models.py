@@ -1,5 +1,9 @@
+import math
 from django.db import models
+from django.db.models import F, FloatField
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
 from apps.users.models import User
+from core.geo import EARTH_RADIUS_KM
 
 class Banner(models.Model):
     title = models.CharField(max_length=100)
@@ -11,6 +15,36 @@ class Banner(models.Model):
     def __str__(self):
         return self.title
 
+class StoreQuerySet(models.QuerySet):
+    def with_distance(self, lat, lng):
+        """Annotate ``distance`` (km) from the given point using the Haversine formula in SQL"""
+        store_lat = Radians(Cast('latitude', FloatField()))
+        store_lng = Radians(Cast('longitude', FloatField()))
+        user_lat = math.radians(lat)
+
+        a = Power(Sin((store_lat - user_lat) / 2.0), 2) + math.cos(user_lat) * Cos(store_lat) \
+            * Power(Sin((store_lng - math.radians(lng)) / 2.0), 2)
+
+        return self.annotate(distance=2.0 * EARTH_RADIUS_KM * ASin(Least(Sqrt(a), 1.0)))
+
+    def within_bbox(self, min_lat, min_lng, max_lat, max_lng):
+        return self.filter(
+            latitude__range=(round(min_lat, 6), round(max_lat, 6)),
+            longitude__range=(round(min_lng, 6), round(max_lng, 6)),
+        )
+
+    def serviceable_from(self, lat, lng, bbox):
+        """Stores whose delivery radius covers the point, nearest first.
+
+        ``bbox`` must enclose every store that can serve the point (see
+        ``serviceability.serviceable_bbox``). It is applied first so the
+        database can narrow rows with the coordinate index before evaluating
+        the distance expression.
+        """
+        return self.within_bbox(*bbox).with_distance(lat, lng).filter(
+            distance__lte=F('delivery_radius')
+        ).order_by('distance', 'id')
+
 class Store(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
@@ -23,6 +57,14 @@ class Store(models.Model):
     delivery_radius = models.IntegerField(default=5)
     minimum_order = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     delivery_fee = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StoreQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'latitude', 'longitude'], name='store_active_lat_lng_idx'),
+        ]
 
     def __str__(self):
         return self.name
\ No newline at end of file
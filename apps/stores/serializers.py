@@ -1,7 +1,9 @@
+from decimal import Decimal
 from rest_framework import serializers
 from .models import Store, Banner
 from apps.products.models import Category
 from django.conf import settings
+from core.images import image_variants
 from apps.products.serializers import ProductSerializer
 
 class BannerSerializer(serializers.ModelSerializer):
@@ -11,16 +13,31 @@ class BannerSerializer(serializers.ModelSerializer):
 
 class StoreSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     def get_image(self, obj):
         if obj.image:
             return f"{settings.SITE_URL}{settings.MEDIA_URL}{obj.image}"
         return None
 
+    def get_image_variants(self, obj):
+        return image_variants(obj.image)
+
     class Meta:
         model = Store
         fields = '__all__'
 
+class NearestStoreSerializer(StoreSerializer):
+    distance = serializers.SerializerMethodField()
+    estimated_delivery_fee = serializers.SerializerMethodField()
+
+    def get_distance(self, obj):
+        return round(obj.distance, 2)
+
+    def get_estimated_delivery_fee(self, obj):
+        fee = obj.delivery_fee + Decimal(str(settings.DELIVERY_FEE_PER_KM)) * Decimal(str(obj.distance))
+        return str(fee.quantize(Decimal('0.01')))
+
 class HomeResponseSerializer(serializers.Serializer):
     stores = StoreSerializer(many=True)
     categories = serializers.SerializerMethodField()
@@ -28,8 +45,7 @@ class HomeResponseSerializer(serializers.Serializer):
     products = ProductSerializer(many=True)  # ADD THIS LINE
 
     def get_categories(self, obj):
-        categories = Category.objects.filter(is_active=True)
-        return CategorySerializer(categories, many=True).data
+        return CategorySerializer(obj['categories'], many=True).data
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
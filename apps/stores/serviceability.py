@@ -0,0 +1,119 @@
+"""Serviceable-store lookups cached per geohash cell.
+
+For every geohash cell a customer has asked about we cache the stores whose
+delivery circle reaches any part of that cell, as ``(id, lat, lng, radius)``
+tuples. A lookup is then one cache read plus an exact distance check over a
+handful of candidates, which yields the bounding box store listings hand to
+``Store.objects.serviceable_from`` as their index prefilter. Saving or
+deleting a store only invalidates the cells its delivery circle (old and
+new) covers, plus the cached largest delivery radius that pads every cell's
+candidate query.
+
+This is the spatial index behind store listings. It replaced a per-process
+fixed-degree grid (``StoreGridIndex``): each worker held its own copy of
+that grid, built from the whole store table, and only saw other workers'
+store edits on its periodic rebuild. Cells here are built lazily for the
+areas customers actually open and are dropped exactly where a store
+changed. Nearest-store queries use the KD-tree in spatial.py.
+
+Invalidation only reaches other workers through a shared cache
+(``REDIS_CACHE_URL``). With the per-process LocMem cache, cells and the
+largest radius live only ``SERVICEABILITY_LOCAL_CACHE_TIMEOUT`` seconds, so
+a store added, moved or widened in one worker shows up in the others after
+at most that long.
+"""
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from core.caching import cache_timeout
+from core.geo import (
+    CoordinateArray,
+    bbox_around,
+    geohash_bbox,
+    geohash_cells_in_bbox,
+    geohash_encode,
+    haversine_km,
+)
+from .models import Store
+
+CACHE_KEY_PREFIX = 'serviceability'
+MAX_RADIUS_KEY = f'{CACHE_KEY_PREFIX}:max-radius'
+# Slack for the flat clamp in CoordinateArray.distances_to_bbox; candidates are re-checked exactly
+CELL_MATCH_TOLERANCE_KM = 0.05
+
+
+def _cell_key(geohash):
+    return f'{CACHE_KEY_PREFIX}:{geohash}'
+
+
+def _timeout():
+    return cache_timeout(settings.SERVICEABILITY_CACHE_TIMEOUT, settings.SERVICEABILITY_LOCAL_CACHE_TIMEOUT)
+
+
+def max_delivery_radius():
+    """Largest delivery radius (km) among active stores, read from the database when not cached"""
+    radius = cache.get(MAX_RADIUS_KEY)
+    if radius is None:
+        radius = Store.objects.filter(is_active=True).aggregate(radius=Max('delivery_radius'))['radius'] or 0
+        cache.set(MAX_RADIUS_KEY, radius, _timeout())
+    return radius
+
+
+def _load_cell_candidates(geohash):
+    min_lat, min_lng, max_lat, max_lng = geohash_bbox(geohash)
+    max_radius = max_delivery_radius()
+    # Longitudes are padded at the cell edge farther from the equator, where a degree is shortest
+    edge_lat = max(min_lat, max_lat, key=abs)
+    pad_min_lat = bbox_around(min_lat, min_lng, max_radius)[0]
+    pad_max_lat = bbox_around(max_lat, max_lng, max_radius)[2]
+    pad_min_lng = bbox_around(edge_lat, min_lng, max_radius)[1]
+    pad_max_lng = bbox_around(edge_lat, max_lng, max_radius)[3]
+
+    rows = list(Store.objects.filter(is_active=True).within_bbox(
+        pad_min_lat, pad_min_lng, pad_max_lat, pad_max_lng
+    ).values_list('id', 'latitude', 'longitude', 'delivery_radius'))
+
+    # A padded cell in a dense city holds hundreds of stores; score them in one pass
+    coordinates = CoordinateArray.from_rows(row[:3] for row in rows)
+    radii = np.asarray([row[3] for row in rows], dtype=np.float64)
+    reaches = coordinates.distances_to_bbox(min_lat, min_lng, max_lat, max_lng) <= radii + CELL_MATCH_TOLERANCE_KM
+    return [
+        (store_id, float(lat), float(lng), radius)
+        for (store_id, lat, lng, radius), reach in zip(rows, reaches)
+        if reach
+    ]
+
+
+def _cell_candidates(lat, lng):
+    geohash = geohash_encode(lat, lng, settings.SERVICEABILITY_GEOHASH_PRECISION)
+    key = _cell_key(geohash)
+
+    candidates = cache.get(key)
+    if candidates is None:
+        candidates = _load_cell_candidates(geohash)
+        cache.set(key, candidates, _timeout())
+    return candidates
+
+
+def serviceable_bbox(lat, lng):
+    """Tightest (min_lat, min_lng, max_lat, max_lng) around the active stores whose
+    delivery radius covers the point, or None if no store does
+    """
+    serving = [
+        (store_lat, store_lng) for _, store_lat, store_lng, radius in _cell_candidates(lat, lng)
+        if haversine_km(lat, lng, store_lat, store_lng) <= radius
+    ]
+    if not serving:
+        return None
+    latitudes, longitudes = zip(*serving)
+    return min(latitudes), min(longitudes), max(latitudes), max(longitudes)
+
+
+def invalidate_cells_around(lat, lng, radius_km):
+    """Drop cached cells that a delivery circle touches, and the cached largest radius"""
+    cells = geohash_cells_in_bbox(
+        *bbox_around(float(lat), float(lng), radius_km),
+        settings.SERVICEABILITY_GEOHASH_PRECISION
+    )
+    cache.delete_many([_cell_key(geohash) for geohash in cells] + [MAX_RADIUS_KEY])
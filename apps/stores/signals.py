@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from core.images import queue_variants
+from apps.products.models import Category, Product
+from .home import bump_home_version
+from .models import Store, Banner
+from .serviceability import invalidate_cells_around
+from .spatial import store_tree
+
+@receiver(pre_save, sender=Store)
+def remember_previous_store_location(sender, instance, **kwargs):
+    """Keep the stored location so cells around the old position can be invalidated,
+    and the stored image so an unchanged one isn't rendered again
+    """
+    instance._previous_location = None
+    instance._previous_image = None
+    if instance.pk:
+        previous = Store.objects.filter(pk=instance.pk).values_list(
+            'latitude', 'longitude', 'delivery_radius', 'image'
+        ).first()
+        if previous:
+            instance._previous_location = previous[:3]
+            instance._previous_image = previous[3]
+
+@receiver(post_save, sender=Store)
+def update_store_index_on_save(sender, instance, **kwargs):
+    """Keep the in-process store tree and serviceability cache in sync with saved stores"""
+    store_tree.invalidate()
+
+    # Invalidate after commit so a concurrent lookup can't re-cache the old rows
+    locations = [(instance.latitude, instance.longitude, instance.delivery_radius)]
+    previous = getattr(instance, '_previous_location', None)
+    if previous:
+        locations.append(previous)
+
+    def invalidate():
+        for location in locations:
+            invalidate_cells_around(*location)
+
+    transaction.on_commit(invalidate)
+
+@receiver(post_delete, sender=Store)
+def update_store_index_on_delete(sender, instance, **kwargs):
+    """Drop deleted stores from the in-process store tree and serviceability cache"""
+    store_tree.invalidate()
+    location = (instance.latitude, instance.longitude, instance.delivery_radius)
+    transaction.on_commit(lambda: invalidate_cells_around(*location))
+
+@receiver(post_save, sender=Store)
+def generate_image_variants(sender, instance, **kwargs):
+    """Render resized variants of a newly uploaded store image"""
+    if instance.image and instance.image.name != getattr(instance, '_previous_image', None):
+        queue_variants(instance.image.name)
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+@receiver(post_save, sender=Banner)
+@receiver(post_delete, sender=Banner)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_home_payload(sender, instance, **kwargs):
+    """Rebuild the cached home payload when anything shown on it changes"""
+    bump_home_version()
@@ -0,0 +1,104 @@
+import heapq
+import math
+from django.conf import settings
+from core.geo import EARTH_RADIUS_KM
+from core.memindex import InMemoryIndex
+from .models import Store
+
+
+def _unit_vector(lat, lng):
+    lat = math.radians(lat)
+    lng = math.radians(lng)
+    return (math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat))
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def _km_to_chord(distance_km):
+    return 2 * math.sin(min(distance_km / (2 * EARTH_RADIUS_KM), math.pi / 2))
+
+
+class StoreKDTree(InMemoryIndex):
+    """KD-tree over active stores for nearest-store queries.
+
+    Stores are placed on the unit sphere as 3D vectors, where straight-line
+    (chord) distance grows monotonically with great-circle distance, so an
+    ordinary Euclidean KD-tree returns stores in true distance order. The tree
+    is static; store changes just mark it for a rebuild on the next query.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rebuild_interval = settings.STORE_INDEX_REBUILD_INTERVAL
+        self.reset()
+
+    def reset(self):
+        self._root = None
+        self._points = []
+        self._max_radius = 0
+
+    def build(self):
+        rows = Store.objects.filter(is_active=True).values_list(
+            'id', 'latitude', 'longitude', 'delivery_radius'
+        )
+        self._points = [
+            (store_id, _unit_vector(float(lat), float(lng)), radius)
+            for store_id, lat, lng, radius in rows
+        ]
+        self._max_radius = max((point[2] for point in self._points), default=0)
+        self._root = self._build_node(list(range(len(self._points))), 0)
+
+    def _build_node(self, indexes, depth):
+        if not indexes:
+            return None
+        axis = depth % 3
+        indexes.sort(key=lambda i: self._points[i][1][axis])
+        middle = len(indexes) // 2
+        return (
+            indexes[middle],
+            axis,
+            self._build_node(indexes[:middle], depth + 1),
+            self._build_node(indexes[middle + 1:], depth + 1),
+        )
+
+    def nearest(self, lat, lng, k):
+        """Up to ``k`` ``(store_id, distance_km)`` pairs for serviceable stores, nearest first"""
+        self.ensure_built()
+        with self._lock:
+            root, points = self._root, self._points
+            max_chord = _km_to_chord(self._max_radius)
+
+        query = _unit_vector(lat, lng)
+        results = []
+        # Best-first search: the heap mixes tree nodes (keyed by a lower bound
+        # on their distance) and stores (keyed by exact distance), so stores
+        # pop out in increasing distance order.
+        heap = [(0.0, 0, root)]
+        counter = 1
+        while heap and len(results) < k:
+            bound, _, item = heapq.heappop(heap)
+            if bound > max_chord:
+                break
+            if isinstance(item, int):
+                store_id, _, radius = points[item]
+                distance = _chord_to_km(bound)
+                if distance <= radius:
+                    results.append((store_id, distance))
+                continue
+            if item is None:
+                continue
+
+            index, axis, left, right = item
+            chord = math.dist(query, points[index][1])
+            heapq.heappush(heap, (chord, counter, index))
+            diff = query[axis] - points[index][1][axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            heapq.heappush(heap, (bound, counter + 1, near))
+            heapq.heappush(heap, (max(bound, abs(diff)), counter + 2, far))
+            counter += 3
+        return results
+
+
+store_tree = StoreKDTree()
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import StoreListView, StoreDetailView, home_view
+from .views import StoreListView, NearestStoreListView, StoreDetailView, home_view
 
 urlpatterns = [
     path('', StoreListView.as_view(), name='store-list'),
     path('home/', home_view, name='home'),
+    path('nearest/', NearestStoreListView.as_view(), name='store-nearest'),
     path('<int:pk>/', StoreDetailView.as_view(), name='store-detail'),
 ]
\ No newline at end of file
@@ -1,12 +1,17 @@
+from django.http import HttpResponse
 from django.shortcuts import render
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from .models import Store, Banner
+from rest_framework.exceptions import ValidationError
+from .models import Store
 from django.db.models import Q
-from .serializers import StoreSerializer, HomeResponseSerializer
-import math
+from core.conditional import ConditionalGetMixin, not_modified_response, set_validator_headers
+from .home import get_home_payload
+from .serializers import StoreSerializer, NearestStoreSerializer
+from .serviceability import serviceable_bbox
+from .spatial import store_tree
 
 class StoreListView(generics.ListAPIView):
     serializer_class = StoreSerializer
@@ -24,35 +29,47 @@ class StoreListView(generics.ListAPIView):
                 user_lat = float(latitude)
                 user_lng = float(longitude)
 
-                filtered_stores = []
-                for store in queryset:
-                    distance = self.calculate_distance(
-                        user_lat, user_lng,
-                        float(store.latitude), float(store.longitude)
-                    )
-                    if distance <= store.delivery_radius:  
-                        filtered_stores.append(store.id)
-
-                queryset = queryset.filter(id__in=filtered_stores)
+                # The cached cell narrows the bounding box to the stores that
+                # can serve this point; filtering by distance, ordering and
+                # paging then happen in a single query
+                bbox = serviceable_bbox(user_lat, user_lng)
+                if bbox is None:
+                    queryset = queryset.none()
+                else:
+                    queryset = queryset.serviceable_from(user_lat, user_lng, bbox)
             except (ValueError, TypeError):
                 pass  
 
         return queryset
 
-    def calculate_distance(self, lat1, lon1, lat2, lon2):
-        """Calculate distance between two points in kilometers (Haversine formula)"""
-        R = 6371  # Earth's radius in kilometers
+class NearestStoreListView(generics.ListAPIView):
+    """k closest serviceable stores to ?lat=&lng=, sorted by distance"""
+    serializer_class = NearestStoreSerializer
+    permission_classes = (IsAuthenticated,)
+    default_k = 10
+    max_k = 50
 
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
+    def get_queryset(self):
+        try:
+            user_lat = float(self.request.query_params['lat'])
+            user_lng = float(self.request.query_params['lng'])
+            k = int(self.request.query_params.get('k', self.default_k))
+        except (KeyError, ValueError, TypeError):
+            raise ValidationError({'error': 'lat and lng are required numbers, k must be an integer'})
+        k = max(1, min(k, self.max_k))
 
-        a = math.sin(dlat/2) * math.sin(dlat/2) + math.cos(math.radians(lat1)) \
-             * math.cos(math.radians(lat2)) * math.sin(dlon/2) * math.sin(dlon/2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        nearest = store_tree.nearest(user_lat, user_lng, k)
+        stores = Store.objects.filter(is_active=True).in_bulk([store_id for store_id, _ in nearest])
 
-        return R * c
+        results = []
+        for store_id, distance in nearest:
+            store = stores.get(store_id)
+            if store is not None:
+                store.distance = distance
+                results.append(store)
+        return results
 
-class StoreDetailView(generics.RetrieveAPIView):
+class StoreDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Store.objects.filter(is_active=True)
     serializer_class = StoreSerializer
     permission_classes = (IsAuthenticated,)
@@ -62,28 +79,14 @@ class StoreDetailView(generics.RetrieveAPIView):
 def home_view(request):
     """Home endpoint that returns stores, categories, and banners for the home screen"""
     try:
-       
-        stores = Store.objects.filter(is_active=True)[:20]  
-        banners = Banner.objects.filter(is_active=True)
-        from apps.products.models import Category
-        categories = Category.objects.filter(is_active=True)
-
-        from apps.products.models import Product
-        featured_products = Product.objects.filter(
-            is_available=True,
-            store__is_active=True
-        ).select_related('store', 'category').order_by('-created_at')[:12]  
-
-        response_data = {
-            'stores': stores,
-            'categories': categories,
-            'banners': banners,
-            'products': featured_products,
-        }
-        serializer = HomeResponseSerializer(response_data)
-        return Response(serializer.data)
+        payload = get_home_payload()
     except Exception as e:
         return Response(
             {'error': 'Failed to load home data'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+    response = not_modified_response(request, payload['etag'], payload.get('last_modified'))
+    if response is None:
+        response = HttpResponse(payload['content'], content_type='application/json')
+    return set_validator_headers(response, payload['etag'], payload.get('last_modified'))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, CustomerProfile, DeliveryPartnerProfile
+from .models import User, CustomerProfile, DeliveryPartnerProfile, DeviceToken
 from django.contrib.auth.admin import UserAdmin
 
 @admin.register(User)
@@ -8,6 +8,13 @@ class CustomerUserAdmin(UserAdmin):
     list_filter = ('user_type', 'is_verified')
     search_fields = ('username', 'email', 'phone_number')
 
+@admin.register(DeviceToken)
+class DeviceTokenAdmin(admin.ModelAdmin):
+    list_display = ('user', 'platform', 'is_active', 'failure_reason', 'last_seen_at')
+    list_filter = ('platform', 'is_active', 'failure_reason')
+    search_fields = ('user__username', 'token')
+    raw_id_fields = ('user',)
+
 admin.site.register(CustomerProfile)
 admin.site.register(DeliveryPartnerProfile)
 
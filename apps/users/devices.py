@@ -0,0 +1,80 @@
+"""Registry of users' FCM device tokens.
+
+Apps register a token on every launch through the update-fcm-token
+endpoints; notifications go to every active token of the recipient. After
+each send the FCM outcome is fed back with ``record_send_results`` so tokens
+FCM reports as unregistered or invalid are deactivated and never sent to
+again.
+"""
+from django.db.models import Q
+from django.utils import timezone
+from core.utils.fcm import INVALID_ARGUMENT, SENDER_ID_MISMATCH, UNREGISTERED
+from .models import DeviceToken
+
+# FCM errors meaning the token itself will never work again
+DEAD_TOKEN_ERRORS = (UNREGISTERED, SENDER_ID_MISMATCH)
+
+
+def register_device(user, token, platform=None):
+    """Record that ``user`` is signed in on the device owning ``token``"""
+    defaults = {
+        'user': user,
+        'is_active': True,
+        'failure_reason': '',
+        'last_seen_at': timezone.now(),
+    }
+    if platform in dict(DeviceToken.PLATFORM_CHOICES):
+        defaults['platform'] = platform
+    # A token moves to whoever signed in on the device last
+    device, _ = DeviceToken.objects.update_or_create(token=token, defaults=defaults)
+
+    # Keep the legacy column for code and scripts that still read it
+    if user.fcm_token != token:
+        user.fcm_token = token
+        user.save(update_fields=['fcm_token'])
+    return device
+
+
+def active_tokens(users=None, **filters):
+    """Active tokens of ``users`` (a user, a list of ids or a queryset) or of users matching ``filters``"""
+    query = Q(is_active=True)
+    if users is not None:
+        if hasattr(users, 'pk'):
+            query &= Q(user=users)
+        else:
+            query &= Q(user__in=users)
+    if filters:
+        query &= Q(**{f'user__{key}': value for key, value in filters.items()})
+    return list(DeviceToken.objects.filter(query).values_list('token', flat=True))
+
+
+def is_dead_token(result, payload_accepted=False):
+    """Whether a send result proves the token itself is unusable.
+
+    An error raised for a whole batch is about the request, never the
+    tokens. INVALID_ARGUMENT is also reported per token for a bad message
+    (too large, a reserved data key), so it only condemns the token when
+    FCM says the registration token is invalid or when the same message
+    was accepted for other tokens (``payload_accepted``).
+    """
+    if result.batch_error:
+        return False
+    if result.error_code in DEAD_TOKEN_ERRORS:
+        return True
+    if result.error_code == INVALID_ARGUMENT:
+        return payload_accepted or 'registration token' in (result.error or '').lower()
+    return False
+
+
+def record_send_results(results):
+    """Deactivate tokens FCM rejected for good; ``results`` are one message's outcomes, one UPDATE per error code"""
+    payload_accepted = any(result.success for result in results)
+    dead = {}
+    for result in results:
+        if is_dead_token(result, payload_accepted):
+            dead.setdefault(result.error_code, []).append(result.token)
+
+    for error_code, tokens in dead.items():
+        DeviceToken.objects.filter(token__in=tokens, is_active=True).update(
+            is_active=False, failure_reason=error_code
+        )
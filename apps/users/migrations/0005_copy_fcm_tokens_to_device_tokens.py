@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 19:21
+
+from django.db import migrations
+
+
+def copy_fcm_tokens(apps, schema_editor):
+    """Register each user's existing fcm_token as a device"""
+    User = apps.get_model('users', 'User')
+    DeviceToken = apps.get_model('users', 'DeviceToken')
+
+    # A token can only belong to one device; the most recent user wins
+    owners = {}
+    rows = User.objects.exclude(fcm_token__isnull=True).exclude(fcm_token='').order_by('id')
+    for user_id, token in rows.values_list('id', 'fcm_token').iterator():
+        owners[token] = user_id
+
+    DeviceToken.objects.bulk_create(
+        [DeviceToken(user_id=user_id, token=token) for token, user_id in owners.items()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_devicetoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_fcm_tokens, migrations.RunPython.noop),
+    ]
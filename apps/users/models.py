@@ -19,6 +19,30 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
     
+class DeviceToken(models.Model):
+    """An FCM registration token for one of a user's devices"""
+    PLATFORM_CHOICES = (
+        ('android', 'Android'),
+        ('ios', 'iOS'),
+        ('web', 'Web'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='device_tokens')
+    token = models.CharField(max_length=255, unique=True)
+    platform = models.CharField(max_length=10, choices=PLATFORM_CHOICES, default='android')
+    is_active = models.BooleanField(default=True)
+    failure_reason = models.CharField(max_length=50, blank=True, help_text="FCM error that made the token inactive")
+    last_seen_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'is_active'], name='device_token_user_active_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} ({self.platform}{'' if self.is_active else ', inactive'})"
+
 class CustomerProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='customer_profile')
     address = models.TextField()
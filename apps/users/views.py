@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import CustomerProfile, DeliveryPartnerProfile, User, Address
+from .devices import register_device
 from .serializers import (
     CustomerProfileSerializer,
     DeliveryPartnerProfileSerializer,
@@ -133,7 +134,6 @@ def update_fcm_token(request):
             {'error': 'FCM token is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    request.user.fcm_token = token
-    request.user.save()
+    register_device(request.user, token, platform=request.data.get('platform'))
 
     return Response({'message': 'FCM token updated successfully'})
\ No newline at end of file
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Concurrency benchmark: many parallel checkouts on a few hot products.
+
+Fires CHECKOUTS orders from WORKERS threads at POST /api/orders/create/ for
+HOT_PRODUCTS products with STOCK units each, then checks that stock was
+never oversold: every unit is either still in stock or in an order item.
+Uses the configured database (row locks need MySQL to be meaningful) and
+deletes everything it created afterwards.
+"""
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+import django
+from pathlib import Path
+
+# Add the project directory to Python path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.db import connection
+from django.db.models import Sum
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.orders.models import Order, OrderItem
+from apps.orders.views import CreateOrderView
+from apps.products.models import Category, Product
+from apps.stores.models import Store
+from apps.users.models import Address, User
+
+HOT_PRODUCTS = 3
+STOCK = 50
+CHECKOUTS = 300
+WORKERS = 16
+
+factory = APIRequestFactory()
+view = CreateOrderView.as_view()
+
+
+def seed():
+    suffix = uuid.uuid4().hex[:8]
+    user = User.objects.create_user(username=f'bench_{suffix}', password=uuid.uuid4().hex)
+    address = Address.objects.create(
+        user=user, street='1 Bench Street', city='Bench', state='BN', zip_code='000000',
+        latitude=0, longitude=0
+    )
+    store = Store.objects.create(
+        name=f'Bench Store {suffix}', description='', address='', latitude=0, longitude=0, phone_number='0'
+    )
+    category = Category.objects.create(name=f'Bench {suffix}')
+    products = [
+        Product.objects.create(store=store, category=category, name=f'Hot item {i}', description='',
+                               price=10, image='products/bench.jpg', stock_quantity=STOCK)
+        for i in range(HOT_PRODUCTS)
+    ]
+    return user, address, store, category, products
+
+
+def checkout(user, address_id, product_ids, results, lock):
+    items = [
+        {'product_id': product_id, 'quantity': random.randint(1, 3)}
+        for product_id in random.sample(product_ids, random.randint(1, len(product_ids)))
+    ]
+    request = factory.post('/api/orders/create/', {'address_id': address_id, 'items': items}, format='json')
+    force_authenticate(request, user=user)
+    start = time.perf_counter()
+    try:
+        status_code = view(request).status_code
+    except Exception as error:
+        status_code = type(error).__name__
+    elapsed = time.perf_counter() - start
+    with lock:
+        results.append((status_code, elapsed))
+
+
+def worker(queue, *args):
+    try:
+        while True:
+            try:
+                queue.pop()
+            except IndexError:
+                return
+            checkout(*args)
+    finally:
+        connection.close()
+
+
+def run_benchmark():
+    user, address, store, category, products = seed()
+    product_ids = [product.id for product in products]
+    results, lock = [], threading.Lock()
+    queue = list(range(CHECKOUTS))
+
+    try:
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=worker, args=(queue, user, address.id, product_ids, results, lock))
+            for _ in range(WORKERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        placed = sum(1 for status_code, _ in results if status_code == 201)
+        rejected = sum(1 for status_code, _ in results if status_code == 400)
+        errors = len(results) - placed - rejected
+        latencies = sorted(duration for _, duration in results)
+        print(f"{len(results)} checkouts in {elapsed:.2f}s ({len(results) / elapsed:.0f}/s) with {WORKERS} workers")
+        print(f"placed {placed} | out of stock {rejected} | errors {errors}")
+        print(f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms | "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+        oversold = False
+        for product in Product.objects.filter(id__in=product_ids).order_by('id'):
+            sold = OrderItem.objects.filter(product=product).aggregate(total=Sum('quantity'))['total'] or 0
+            ok = product.stock_quantity >= 0 and sold + product.stock_quantity == STOCK
+            oversold |= not ok
+            print(f"  {product.name}: sold {sold}, left {product.stock_quantity} {'OK' if ok else 'OVERSOLD'}")
+        print("FAIL: stock was oversold" if oversold else "OK: no overselling")
+    finally:
+        Order.objects.filter(customer=user).delete()
+        category.delete()
+        store.delete()
+        user.delete()
+
+
+if __name__ == "__main__":
+    run_benchmark()
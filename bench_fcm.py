@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Throughput benchmark: per-token FCM sends vs 500-token multicast batches.
+
+Starts a fake FCM endpoint on localhost that answers each request after
+ROUND_TRIP_MS (and marks a few tokens as unregistered), points the
+HTTPSender at it, and fans one notification out to TOKEN_COUNT devices
+both ways.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import django
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the project directory to Python path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.conf import settings
+from core.utils import fcm
+
+TOKEN_COUNT = 300
+ROUND_TRIP_MS = 20
+UNREGISTERED_EVERY = 50
+
+
+class FakeFCMHandler(BaseHTTPRequestHandler):
+    requests_served = 0
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(ROUND_TRIP_MS / 1000)
+        results = [
+            {'error': fcm.UNREGISTERED} if int(token.rsplit('-', 1)[1]) % UNREGISTERED_EVERY == 0
+            else {'message_id': f'projects/fake/messages/{token}'}
+            for token in payload['tokens']
+        ]
+        body = json.dumps({'results': results}).encode()
+        FakeFCMHandler.requests_served += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_benchmark():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeFCMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.FCM_SENDER = 'core.utils.fcm.HTTPSender'
+    settings.FCM_HTTP_SENDER_URL = f'http://127.0.0.1:{server.server_address[1]}/batch'
+    fcm.get_sender.cache_clear()
+
+    tokens = [f'device-token-{i}' for i in range(TOKEN_COUNT)]
+    data = {'order_id': '1', 'status': 'placed', 'type': 'status_update'}
+    sender = fcm.get_sender()
+
+    FakeFCMHandler.requests_served = 0
+    start = time.perf_counter()
+    serial = [sender.send_batch([token], data, title='Order #1', body='Placed')[0] for token in tokens]
+    serial_time = time.perf_counter() - start
+    serial_requests = FakeFCMHandler.requests_served
+
+    FakeFCMHandler.requests_served = 0
+    start = time.perf_counter()
+    batched = fcm.send_to_tokens(tokens, data=data, title='Order #1', body='Placed')
+    batched_time = time.perf_counter() - start
+    batched_requests = FakeFCMHandler.requests_served
+
+    server.shutdown()
+    for label, results, elapsed, request_count in (
+        ('one per token', serial, serial_time, serial_requests),
+        ('multicast', batched, batched_time, batched_requests),
+    ):
+        delivered = sum(result.success for result in results)
+        unregistered = sum(result.error_code == fcm.UNREGISTERED for result in results)
+        print(f"{label:>14}: {elapsed * 1000:8.1f} ms, {request_count:3} requests, "
+              f"{delivered} delivered, {unregistered} unregistered, {len(results) / elapsed:8.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Latency benchmark for ?fuzzy=1 product search (TrigramIndex) at 100k products"""
+import os
+import random
+import statistics
+import sys
+import time
+import django
+from pathlib import Path
+
+# Add the project directory to Python path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from apps.products.search import TrigramIndex
+
+PRODUCT_COUNT = 100_000
+QUERY_COUNT = 2_000
+
+BRANDS = ['amul', 'britannia', 'haldiram', 'tata', 'nestle', 'mother', 'dairy', 'fresho',
+          'organic', 'farm', 'daily', 'golden', 'royal', 'nature', 'kissan', 'patanjali']
+ITEMS = ['milk', 'paneer', 'tomato', 'potato', 'onion', 'butter', 'cheese', 'bread', 'biscuit',
+         'chips', 'namkeen', 'rice', 'atta', 'dal', 'sugar', 'salt', 'ghee', 'curd', 'yogurt',
+         'banana', 'apple', 'mango', 'spinach', 'coriander', 'chilli', 'ginger', 'garlic', 'tea',
+         'coffee', 'juice', 'noodles', 'ketchup', 'jam', 'honey', 'oats', 'cornflakes', 'eggs']
+VARIANTS = ['fresh', 'toned', 'premium', 'classic', 'masala', 'salted', 'low', 'fat', 'whole',
+            'wheat', 'brown', 'green', 'red', 'baby', 'cherry', 'full', 'cream', 'lite']
+
+
+def synthetic_rows(count):
+    random.seed(7)
+    for product_id in range(1, count + 1):
+        name = f"{random.choice(BRANDS)} {random.choice(VARIANTS)} {random.choice(ITEMS)} {product_id % 997}"
+        yield product_id, name, random.randint(1, 50), random.randint(1, 20)
+
+
+def misspell(word):
+    """Drop, double or swap a character, like a hurried customer would"""
+    if len(word) < 4:
+        return word
+    i = random.randrange(1, len(word) - 1)
+    return random.choice([
+        word[:i] + word[i + 1:],
+        word[:i] + word[i] + word[i:],
+        word[:i - 1] + word[i] + word[i - 1] + word[i + 1:],
+    ])
+
+
+class SyntheticTrigramIndex(TrigramIndex):
+    def build(self):
+        self.load(synthetic_rows(PRODUCT_COUNT))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_benchmark():
+    index = SyntheticTrigramIndex()
+    start = time.perf_counter()
+    index.ensure_built()
+    print(f"Indexed {PRODUCT_COUNT} products in {time.perf_counter() - start:.2f}s "
+          f"({len(index._word_trigrams)} distinct words)")
+
+    random.seed(11)
+    queries = []
+    for _ in range(QUERY_COUNT):
+        item = random.choice(ITEMS)
+        kind = random.random()
+        if kind < 0.4:
+            queries.append(misspell(item))
+        elif kind < 0.7:
+            queries.append(f"{random.choice(BRANDS)} {misspell(item)}")
+        else:
+            # Search-as-you-type: a partial word
+            queries.append(item[:random.randint(3, len(item))])
+
+    timings = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        results = index.ranked_ids(query, limit=500)
+        timings.append((time.perf_counter() - start) * 1000)
+        hits += bool(results)
+
+    print(f"{QUERY_COUNT} queries, {hits} with results")
+    print(f"p50 {percentile(timings, 0.50):.2f} ms | p99 {percentile(timings, 0.99):.2f} ms | "
+          f"mean {statistics.mean(timings):.2f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-row Haversine loops vs vectorized core.geo.CoordinateArray.
+
+Covers the point-in-radius check and the cell scoring that
+apps/stores/serviceability.py runs when it builds a geohash cell's
+candidate stores.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the project directory to Python path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+import numpy as np
+from core.geo import CoordinateArray, distance_to_bbox_km, geohash_bbox, geohash_encode, haversine_km
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark():
+    random.seed(42)
+    user_lat, user_lng = 19.0760, 72.8777
+    cell = geohash_bbox(geohash_encode(user_lat, user_lng, 6))  # SERVICEABILITY_GEOHASH_PRECISION
+
+    for size in (1_000, 10_000, 100_000):
+        rows = [
+            (i, random.uniform(18.5, 19.5), random.uniform(72.5, 73.5), random.randint(2, 10))
+            for i in range(size)
+        ]
+        radii = np.asarray([row[3] for row in rows], dtype=np.float64)
+        coords = CoordinateArray.from_rows((row[0], row[1], row[2]) for row in rows)
+
+        def per_row_loop():
+            return [
+                store_id for store_id, lat, lng, radius in rows
+                if haversine_km(user_lat, user_lng, lat, lng) <= radius
+            ]
+
+        def vectorized():
+            return coords.within(user_lat, user_lng, radii)
+
+        assert sorted(per_row_loop()) == sorted(vectorized().tolist())
+
+        loop_time = best_of(per_row_loop)
+        vector_time = best_of(vectorized)
+        print(f"N={size:>7} radius: loop {loop_time * 1000:8.2f} ms | "
+              f"vectorized {vector_time * 1000:7.3f} ms | speedup {loop_time / vector_time:6.1f}x")
+
+        def cell_loop():
+            return [
+                store_id for store_id, lat, lng, radius in rows
+                if distance_to_bbox_km(lat, lng, *cell) <= radius
+            ]
+
+        def cell_vectorized():
+            return coords.ids[coords.distances_to_bbox(*cell) <= radii]
+
+        assert sorted(cell_loop()) == sorted(cell_vectorized().tolist())
+
+        loop_time = best_of(cell_loop)
+        vector_time = best_of(cell_vectorized)
+        print(f"N={size:>7} cell:   loop {loop_time * 1000:8.2f} ms | "
+              f"vectorized {vector_time * 1000:7.3f} ms | speedup {loop_time / vector_time:6.1f}x")
+
+    # M points x N stores, e.g. matching waiting orders against partners
+    points_lat = [random.uniform(18.5, 19.5) for _ in range(200)]
+    points_lng = [random.uniform(72.5, 73.5) for _ in range(200)]
+    matrix_time = best_of(lambda: coords.distance_matrix(points_lat, points_lng), repeat=3)
+    print(f"Distance matrix 200 x {len(coords)}: {matrix_time * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
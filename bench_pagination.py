@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark: OFFSET pagination vs keyset pagination at page 1 and page 5,000.
+
+Creates ~100k throwaway products inside a transaction that is rolled back at
+the end, so it can be pointed at a development database.
+"""
+import os
+import sys
+import time
+import django
+from pathlib import Path
+
+# Add the project directory to Python path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.products.models import Category, Product
+from apps.products.views import ProductKeysetPagination, ProductPagination
+from apps.stores.models import Store
+
+PAGE_SIZE = 20
+DEEP_PAGE = 5_000
+ROW_COUNT = PAGE_SIZE * (DEEP_PAGE + 1)
+BATCH_SIZE = 5_000
+ORDERING = ProductKeysetPagination.ordering  # what ProductListView pages by: the primary key
+
+factory = APIRequestFactory()
+
+
+def timed(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def offset_page(queryset, page):
+    request = Request(factory.get('/api/products/', {'page': page}))
+    return ProductPagination().paginate_queryset(queryset, request)
+
+
+def keyset_paginator():
+    return ProductKeysetPagination()
+
+
+def keyset_page(queryset, cursor):
+    params = {'count': '0', 'cursor': cursor} if cursor else {'count': '0'}
+    request = Request(factory.get('/api/products/', params))
+    return keyset_paginator().paginate_queryset(queryset, request)
+
+
+def seed():
+    store = Store.objects.create(
+        name='Bench Store', description='', address='', latitude=0, longitude=0, phone_number='0'
+    )
+    category = Category.objects.create(name='Bench')
+    for start in range(0, ROW_COUNT, BATCH_SIZE):
+        Product.objects.bulk_create([
+            Product(store=store, category=category, name=f'Bench product {i}', description='',
+                    price=1, image='products/bench.jpg')
+            for i in range(start, min(start + BATCH_SIZE, ROW_COUNT))
+        ])
+    return Product.objects.order_by(*ORDERING)
+
+
+def run_benchmark():
+    with transaction.atomic():
+        print(f"Seeding {ROW_COUNT} products...")
+        queryset = seed()
+
+        # Cursor pointing at the last row of page DEEP_PAGE - 1
+        paginator = keyset_paginator()
+        anchor = queryset.values_list(*ORDERING)[(DEEP_PAGE - 1) * PAGE_SIZE - 1]
+        deep_cursor = paginator.encode_cursor(list(anchor), False)
+        assert [p.id for p in keyset_page(queryset, deep_cursor)] == \
+            [p.id for p in offset_page(queryset, DEEP_PAGE)]
+
+        print(f"OFFSET  page 1:     {timed(lambda: offset_page(queryset, 1)):8.2f} ms")
+        print(f"OFFSET  page {DEEP_PAGE}:  {timed(lambda: offset_page(queryset, DEEP_PAGE)):8.2f} ms")
+        print(f"Keyset  page 1:     {timed(lambda: keyset_page(queryset, None)):8.2f} ms")
+        print(f"Keyset  page {DEEP_PAGE}:  {timed(lambda: keyset_page(queryset, deep_cursor)):8.2f} ms")
+
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    run_benchmark()
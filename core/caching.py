@@ -0,0 +1,15 @@
+"""Helpers for caches that have to stay correct across worker processes."""
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def cache_timeout(shared_timeout, local_timeout):
+    """``local_timeout`` when the default cache is the per-process LocMem cache.
+
+    Invalidations there (deletes, version bumps) never reach other workers,
+    so entries must expire on their own soon enough for changes to show up.
+    With a shared cache (``REDIS_CACHE_URL``) ``shared_timeout`` is used.
+    """
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return local_timeout
+    return shared_timeout
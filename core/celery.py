@@ -0,0 +1,16 @@
+"""
+Celery app for background jobs (push notifications).
+
+Only used when CELERY_BROKER_URL is set; otherwise core.dispatch runs the
+same tasks on an in-process thread pool. Start a worker with:
+
+    celery -A core worker -l info
+"""
+import os
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
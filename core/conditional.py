@@ -0,0 +1,93 @@
+"""Conditional GET (ETag / Last-Modified) helpers for API views.
+
+Validators are computed from cheap aggregate queries (row count, a digest of
+the primary keys and the latest ``updated_at``) so a client polling an
+unchanged screen gets a 304 before any objects are loaded or serialized.
+
+Only the ETag notices a row that was deleted or dropped out of a list's
+filter (the latest remaining ``updated_at`` doesn't move), so list views
+send no Last-Modified; detail views send both.
+"""
+import hashlib
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def queryset_validators(queryset, timestamp_fields=('updated_at',), salt=''):
+    """``(etag, last_modified)`` for a queryset; ``last_modified`` is a Unix timestamp.
+
+    Returns ``(None, None)`` when the queryset is empty so the view can fall
+    through to its normal (e.g. 404) response.
+    """
+    aggregates = {f'latest_{i}': Max(field) for i, field in enumerate(timestamp_fields)}
+    result = queryset.order_by().aggregate(count=Count('pk'), pk_sum=Sum('pk'), **aggregates)
+    if not result['count']:
+        return None, None
+
+    timestamps = [result[key] for key in aggregates if result[key] is not None]
+    last_modified = max(timestamps).timestamp() if timestamps else None
+    fingerprint = f"{result['count']}:{result['pk_sum']}:{last_modified}:{salt}"
+    return f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"', last_modified
+
+
+def not_modified_response(request, etag=None, last_modified=None):
+    """A 304 response if the request's validators match, otherwise None"""
+    if etag is None and last_modified is None:
+        return None
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified) if last_modified is not None else None,
+    )
+
+
+def set_validator_headers(response, etag=None, last_modified=None):
+    if etag is not None:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """Answer If-None-Match / If-Modified-Since before the view serializes anything.
+
+    Views list the timestamp fields to compare in ``validator_fields``
+    (related fields like ``store__updated_at`` are allowed) or override
+    ``get_validators``. Parts of the body that don't come from the queryset
+    belong in ``get_validator_salt``.
+    """
+    validator_fields = ('updated_at',)
+
+    def is_detail_request(self):
+        return (self.lookup_url_kwarg or self.lookup_field) in self.kwargs
+
+    def get_validator_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.is_detail_request():
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_validator_salt(self):
+        # The query string is part of the ETag: filters and page change the body
+        return self.request.get_full_path()
+
+    def get_validators(self):
+        etag, last_modified = queryset_validators(
+            self.get_validator_queryset(),
+            self.validator_fields,
+            salt=self.get_validator_salt(),
+        )
+        if not self.is_detail_request():
+            # A removed row leaves the latest timestamp unchanged; only the ETag notices
+            last_modified = None
+        return etag, last_modified
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        response = not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return set_validator_headers(response, etag, last_modified)
@@ -0,0 +1,80 @@
+"""Run background jobs off the request path.
+
+Views call ``enqueue(task, *args)`` with a Celery task and small,
+serializable arguments (ids and statuses, not model instances). The job is
+submitted once the current transaction commits, so workers never see rows
+that were rolled back. With ``CELERY_BROKER_URL`` set it goes to Celery;
+otherwise it runs on a small in-process thread pool, which is enough for
+local development.
+
+Retries are declared on the task (``autoretry_for``, ``max_retries``,
+``retry_backoff``). Celery schedules them with a countdown; the local pool
+re-submits a failed job after the same exponential backoff from a timer
+thread, so a transient outage isn't hit again immediately and no pool
+thread sleeps while waiting.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Timer
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+_executor = None
+_executor_lock = Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DISPATCH_THREAD_WORKERS, thread_name_prefix='dispatch'
+            )
+        return _executor
+
+
+def _retry_delay(task, retries):
+    """Seconds before retry number ``retries + 1``, as Celery's autoretry computes it"""
+    backoff = getattr(task, 'retry_backoff', False)
+    if not backoff:
+        return task.default_retry_delay
+    return get_exponential_backoff_interval(
+        factor=int(backoff),
+        retries=retries,
+        maximum=getattr(task, 'retry_backoff_max', 600),
+        full_jitter=getattr(task, 'retry_jitter', True),
+    )
+
+
+def _run_locally(task, args, retries=0):
+    close_old_connections()
+    try:
+        # Called directly, a task raises instead of retrying eagerly in this thread
+        task(*args)
+    except tuple(getattr(task, 'autoretry_for', ())) as error:
+        if task.max_retries is not None and retries >= task.max_retries:
+            print(f"Background job {task.name}{args} failed after {retries} retries: {error}")
+        else:
+            timer = Timer(_retry_delay(task, retries), _submit_locally, (task, args, retries + 1))
+            timer.daemon = True
+            timer.start()
+    except Exception as error:
+        print(f"Background job {task.name}{args} failed: {error}")
+    finally:
+        close_old_connections()
+
+
+def _submit_locally(task, args, retries=0):
+    _get_executor().submit(_run_locally, task, args, retries)
+
+
+def _submit(task, args):
+    if settings.CELERY_BROKER_URL:
+        task.delay(*args)
+    else:
+        _submit_locally(task, args)
+
+
+def enqueue(task, *args):
+    """Run ``task(*args)`` in the background after the current transaction commits"""
+    transaction.on_commit(lambda: _submit(task, args))
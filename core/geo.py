@@ -0,0 +1,295 @@
+"""Geographic helpers shared by store lookup, dispatch, ETA and GPS trail code.
+
+Distances are great-circle (Haversine) distances in kilometers. The
+vectorized functions take NumPy arrays and evaluate one point against N
+coordinates (or M points against N) in a single pass instead of a Python loop.
+"""
+import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Calculate distance between two points in kilometers (Haversine formula)"""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+
+    a = math.sin(dlat/2) * math.sin(dlat/2) + math.cos(math.radians(lat1)) \
+         * math.cos(math.radians(lat2)) * math.sin(dlon/2) * math.sin(dlon/2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+
+    return EARTH_RADIUS_KM * c
+
+
+def _haversine(lat1, lng1, cos_lat1, lat2, lng2, cos_lat2):
+    """Vectorized Haversine over broadcastable arrays of radians"""
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + cos_lat1 * cos_lat2 * np.sin((lng2 - lng1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class CoordinateArray:
+    """Coordinates of N points kept as contiguous float64 arrays.
+
+    Radians and cos(latitude) are computed once when the array is built, so
+    each query only pays for the terms that depend on the query point.
+    """
+
+    def __init__(self, ids, latitudes, longitudes):
+        self.ids = np.ascontiguousarray(ids, dtype=np.int64)
+        self.lat = np.radians(np.ascontiguousarray(latitudes, dtype=np.float64))
+        self.lng = np.radians(np.ascontiguousarray(longitudes, dtype=np.float64))
+        self.cos_lat = np.cos(self.lat)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from an iterable of ``(id, latitude, longitude)`` tuples"""
+        rows = list(rows)
+        if not rows:
+            return cls([], [], [])
+        ids, lats, lngs = zip(*rows)
+        return cls(ids, [float(v) for v in lats], [float(v) for v in lngs])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distances_from(self, lat, lng):
+        """Distances (km) from one point to every coordinate, shape (N,)"""
+        lat = math.radians(lat)
+        return _haversine(lat, math.radians(lng), math.cos(lat), self.lat, self.lng, self.cos_lat)
+
+    def distance_matrix(self, latitudes, longitudes):
+        """Distances (km) from M points to every coordinate, shape (M, N)"""
+        lat = np.radians(np.asarray(latitudes, dtype=np.float64))[:, np.newaxis]
+        lng = np.radians(np.asarray(longitudes, dtype=np.float64))[:, np.newaxis]
+        return _haversine(lat, lng, np.cos(lat), self.lat, self.lng, self.cos_lat)
+
+    def within(self, lat, lng, radius_km):
+        """IDs whose distance from the point is at most ``radius_km``.
+
+        ``radius_km`` may be a scalar or an array of per-point radii.
+        """
+        return self.ids[self.distances_from(lat, lng) <= radius_km]
+
+    def distances_to_bbox(self, min_lat, min_lng, max_lat, max_lng):
+        """Distances (km) from every coordinate to the nearest point of a bounding box
+        (0 inside it), shape (N,); the vectorized ``distance_to_bbox_km``
+        """
+        lat = np.clip(self.lat, math.radians(min_lat), math.radians(max_lat))
+        lng = np.clip(self.lng, math.radians(min_lng), math.radians(max_lng))
+        return _haversine(self.lat, self.lng, self.cos_lat, lat, lng, np.cos(lat))
+
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_cell_size(precision):
+    """(height, width) in degrees of a geohash cell at the given precision"""
+    bits = 5 * precision
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def geohash_encode(lat, lng, precision):
+    """Encode a point as a geohash string of ``precision`` characters"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bit = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        middle = (rng[0] + rng[1]) / 2
+        if coord >= middle:
+            value = (value << 1) | 1
+            rng[0] = middle
+        else:
+            value <<= 1
+            rng[1] = middle
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bit = 0
+            value = 0
+    return ''.join(chars)
+
+
+def geohash_bbox(geohash):
+    """(min_lat, min_lng, max_lat, max_lng) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            middle = (rng[0] + rng[1]) / 2
+            if value >> shift & 1:
+                rng[0] = middle
+            else:
+                rng[1] = middle
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def geohash_cells_in_bbox(min_lat, min_lng, max_lat, max_lng, precision):
+    """Geohashes of every cell intersecting the bounding box"""
+    height, width = geohash_cell_size(precision)
+    min_lat = max(min_lat, -90.0)
+    max_lat = min(max_lat, 90.0 - height / 2)
+    cells = set()
+    lat = math.floor(min_lat / height) * height + height / 2
+    while lat <= max_lat + height / 2:
+        lng = math.floor(min_lng / width) * width + width / 2
+        while lng <= max_lng + width / 2:
+            cells.add(geohash_encode(lat, ((lng + 180.0) % 360.0) - 180.0, precision))
+            lng += width
+        lat += height
+    return cells
+
+
+def bbox_around(lat, lng, radius_km):
+    """(min_lat, min_lng, max_lat, max_lng) enclosing a circle of ``radius_km``.
+
+    Uses the same sphere as ``haversine_km``, so every point within
+    ``radius_km`` by that measure falls inside the box.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    # Widest longitude span of the circle; a circle around a pole spans them all
+    ratio = math.sin(angle) / max(math.cos(math.radians(lat)), 1e-9)
+    dlng = math.degrees(math.asin(ratio)) if ratio < 1 else 180.0
+    return lat - dlat, lng - dlng, lat + dlat, lng + dlng
+
+
+def distance_to_bbox_km(lat, lng, min_lat, min_lng, max_lat, max_lng):
+    """Distance from a point to the nearest point of a bounding box (0 if inside)"""
+    return haversine_km(
+        lat, lng,
+        min(max(lat, min_lat), max_lat),
+        min(max(lng, min_lng), max_lng),
+    )
+
+
+def _offset_m(lat0, lng0, cos_lat0, lat, lng):
+    """Local equirectangular (x, y) offset in meters of a point from (lat0, lng0)"""
+    return (
+        (lng - lng0) * cos_lat0 * KM_PER_DEGREE * 1000,
+        (lat - lat0) * KM_PER_DEGREE * 1000,
+    )
+
+
+def _distance_to_segment_m(px, py, bx, by):
+    """Distance in meters from (px, py) to the segment from the origin to (bx, by)"""
+    length_sq = bx * bx + by * by
+    t = 0.0 if length_sq == 0 else min(max((px * bx + py * by) / length_sq, 0.0), 1.0)
+    return math.hypot(px - t * bx, py - t * by)
+
+
+def simplify_track(points, tolerance_m, max_window=256):
+    """Drop points that add nothing to a GPS trail.
+
+    Streaming (opening window) variant of Douglas-Peucker: starting from the
+    last kept point, the window grows while every point inside it lies within
+    ``tolerance_m`` of the straight line to the newest point; when one falls
+    outside, the previous point is kept and becomes the new start. Points are
+    ``(lat, lng, ...)`` tuples, extra items are carried along. Runs in one
+    pass, so fixes can be fed in as they arrive; the first and last points are
+    always kept. A window is also closed after ``max_window`` points, which
+    bounds the work per point when the rider stands still for a long time.
+    """
+    points = list(points)
+    if len(points) <= 2:
+        return points
+
+    kept = [points[0]]
+    window = []
+    for point in points[1:]:
+        anchor = kept[-1]
+        cos_lat = math.cos(math.radians(anchor[0]))
+        bx, by = _offset_m(anchor[0], anchor[1], cos_lat, point[0], point[1])
+        if len(window) >= max_window or any(
+            _distance_to_segment_m(*_offset_m(anchor[0], anchor[1], cos_lat, inner[0], inner[1]), bx, by) > tolerance_m
+            for inner in window
+        ):
+            kept.append(window[-1])
+            window = []
+        window.append(point)
+    if window:
+        kept.append(window[-1])
+    return kept
+
+
+def encode_signed_values(values):
+    """Encode integers with the polyline algorithm's zig-zag, 5-bit chunked ASCII scheme"""
+    chunks = []
+    for value in values:
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+    return ''.join(chunks)
+
+
+def decode_signed_values(encoded):
+    """Inverse of ``encode_signed_values``"""
+    values = []
+    value = shift = 0
+    for char in encoded:
+        chunk = ord(char) - 63
+        value |= (chunk & 0x1f) << shift
+        shift += 5
+        if chunk < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    return values
+
+
+def delta_encode(values):
+    """Encode integers as differences from their predecessor (small for slowly changing series)"""
+    previous = 0
+    deltas = []
+    for value in values:
+        deltas.append(value - previous)
+        previous = value
+    return encode_signed_values(deltas)
+
+
+def delta_decode(encoded):
+    """Inverse of ``delta_encode``"""
+    total = 0
+    values = []
+    for delta in decode_signed_values(encoded):
+        total += delta
+        values.append(total)
+    return values
+
+
+def encode_polyline(coordinates, precision=5):
+    """Encoded polyline (Google format) of ``(lat, lng)`` pairs"""
+    factor = 10 ** precision
+    scaled = [
+        round(float(value) * factor)
+        for lat, lng in coordinates
+        for value in (lat, lng)
+    ]
+    # Latitudes and longitudes are delta-encoded as two interleaved series
+    deltas = [
+        value - (scaled[i - 2] if i >= 2 else 0)
+        for i, value in enumerate(scaled)
+    ]
+    return encode_signed_values(deltas)
+
+
+def decode_polyline(encoded, precision=5):
+    """``(lat, lng)`` pairs of an encoded polyline"""
+    factor = 10 ** precision
+    values = decode_signed_values(encoded)
+    for i in range(2, len(values)):
+        values[i] += values[i - 2]
+    return [(values[i] / factor, values[i + 1] / factor) for i in range(0, len(values) - 1, 2)]
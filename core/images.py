@@ -0,0 +1,118 @@
+"""Resized variants of uploaded images.
+
+For an original such as ``products/milk.jpg`` the variants are stored next to
+it as ``products/milk.w160.webp`` and so on, one per width in
+``IMAGE_VARIANT_WIDTHS`` that is narrower than the original (images are never
+upscaled). Variants are rendered by a background job queued when a model
+with an image is saved, or the first time a serializer asks for an image
+whose variants aren't known yet; requests never decode images themselves. Saves
+only queue a render when the stored image actually changed.
+Which variants exist is cached per original, so serializing a page of
+products doesn't touch the file system. Originals that are missing or
+unreadable are remembered for ``IMAGE_VARIANT_FAILURE_TIMEOUT`` seconds
+instead of being retried on every request.
+"""
+import os
+from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+FORMAT_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def _cache_key(name):
+    return f'image-variants:{name}'
+
+
+def variant_name(name, width):
+    root, _ = os.path.splitext(name)
+    return f'{root}.w{width}.{FORMAT_EXTENSIONS[settings.IMAGE_VARIANT_FORMAT]}'
+
+
+def _render(image, width):
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.Resampling.LANCZOS)
+    if settings.IMAGE_VARIANT_FORMAT == 'JPEG' and resized.mode != 'RGB':
+        resized = resized.convert('RGB')
+
+    buffer = BytesIO()
+    resized.save(buffer, settings.IMAGE_VARIANT_FORMAT, quality=settings.IMAGE_VARIANT_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(name, force=False, storage=default_storage):
+    """Create missing variants of the original ``name``; returns ``{width: name}``.
+
+    With ``force`` existing variants are rendered again. Returns an empty dict
+    when the original is missing or isn't an image.
+    """
+    try:
+        with storage.open(name) as original:
+            image = Image.open(original)
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+            variants = {}
+            for width in settings.IMAGE_VARIANT_WIDTHS:
+                if width >= image.width:
+                    continue
+                variant = variant_name(name, width)
+                if force or not storage.exists(variant):
+                    if storage.exists(variant):
+                        storage.delete(variant)
+                    variant = storage.save(variant, _render(image, width))
+                variants[width] = variant
+    except (OSError, UnidentifiedImageError):
+        cache.set(_cache_key(name), {}, settings.IMAGE_VARIANT_FAILURE_TIMEOUT)
+        return {}
+
+    cache.set(_cache_key(name), variants, None)
+    return variants
+
+
+def known_variants(name):
+    """Variants responses have been built with so far (``{}`` while rendering), or None"""
+    return cache.get(_cache_key(name))
+
+
+def stored_image_name(instance, field_name='image'):
+    """Name of the image saved in the database for ``instance``, or None for a new row"""
+    if instance.pk is None:
+        return None
+    return type(instance)._base_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+
+
+def queue_variants(name):
+    """Render the variants of ``name`` in the background"""
+    from apps.products.tasks import render_image_variants
+    from core.dispatch import enqueue
+
+    enqueue(render_image_variants, name)
+
+
+def image_variants(field_file):
+    """``{'160w': url, ...}`` for every width in ``IMAGE_VARIANT_WIDTHS``.
+
+    Widths without a variant (not rendered yet, original too narrow or
+    unreadable) fall back to the original's URL. A cache miss queues one
+    background render and never renders in the caller.
+    """
+    if not field_file:
+        return {}
+    key = _cache_key(field_file.name)
+    variants = cache.get(key)
+    if variants is None:
+        variants = {}
+        # The placeholder makes concurrent misses queue a single render
+        if cache.add(key, variants, settings.IMAGE_VARIANT_FAILURE_TIMEOUT):
+            queue_variants(field_file.name)
+
+    original = f"{settings.SITE_URL}{settings.MEDIA_URL}{field_file.name}"
+    return {
+        f'{width}w': f"{settings.SITE_URL}{settings.MEDIA_URL}{variants[width]}" if width in variants else original
+        for width in sorted(settings.IMAGE_VARIANT_WIDTHS)
+    }
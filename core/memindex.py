@@ -0,0 +1,45 @@
+import threading
+import time
+
+
+class InMemoryIndex:
+    """Base class for per-process lookup structures loaded from the database.
+
+    Subclasses implement ``reset`` (drop all state) and ``build`` (full load).
+    The index is built lazily on first use and rebuilt from scratch every
+    ``rebuild_interval`` seconds, so writes made by other worker processes or
+    by ``QuerySet.update`` (which skips model signals) are eventually picked up.
+    Incremental updates from signals should be ignored while ``is_built`` is
+    False; the next build will see them anyway. ``is_built`` is also False
+    while ``build`` runs, including periodic rebuilds.
+    """
+    rebuild_interval = 300
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+
+    def reset(self):
+        raise NotImplementedError
+
+    def build(self):
+        raise NotImplementedError
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def ensure_built(self):
+        """Build the index if it is empty or older than ``rebuild_interval``"""
+        with self._lock:
+            if self._built_at is None or time.monotonic() - self._built_at > self.rebuild_interval:
+                # Not "built" during the rebuild, so incremental-only work is skipped
+                self._built_at = None
+                self.reset()
+                self.build()
+                self._built_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a full rebuild on next use"""
+        with self._lock:
+            self._built_at = None
@@ -0,0 +1,162 @@
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination that seeks on the ordering columns instead of OFFSET.
+
+    Each page is fetched with ``WHERE (created_at, id) < (last seen values)``
+    so page 5,000 costs the same as page 1. Cursors are opaque base64 tokens
+    returned in ``next``/``previous``. Requests that still send ``?page=``
+    are served by ``fallback_class`` so older app versions keep working.
+
+    The response keeps the ``count`` key of page-number pagination; clients
+    that don't need the total send ``?count=0`` to skip the COUNT query.
+
+    ``ordering`` must end with a unique field; views can override it with a
+    ``keyset_ordering`` attribute. The default, ``('id',)``, is the primary
+    key order the page-number pagination used to serve.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('id',)
+    fallback_class = PageNumberPagination
+
+    def use_fallback(self, request, view):
+        return 'page' in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': reverse}, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            values, reverse = payload['v'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+        return values, reverse
+
+    def coerce_cursor_values(self, model, values):
+        """Convert decoded cursor values to the ordering fields' types (a bad value is NotFound, not a 500)"""
+        coerced = []
+        for field_name, value in zip(self.ordering, values):
+            try:
+                field = model._meta.get_field(field_name.lstrip('-'))
+            except FieldDoesNotExist:
+                coerced.append(value)
+                continue
+            if value is None or isinstance(value, (list, dict)):
+                raise NotFound('Invalid cursor')
+            try:
+                coerced.append(field.to_python(value))
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound('Invalid cursor')
+        return coerced
+
+    def _seek(self, ordering, values, reverse):
+        """Q for rows strictly after ``values`` in ``ordering`` (before, if reverse)"""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            condition |= equal & Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+            equal &= Q(**{name: value})
+
+        # Redundant bound on the leading column so the database can range-scan its index
+        name = ordering[0].lstrip('-')
+        descending = ordering[0].startswith('-') != reverse
+        return Q(**{f'{name}__{"lte" if descending else "gte"}': values[0]}) & condition
+
+    def _key(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        if self.use_fallback(request, view):
+            self.fallback = self.fallback_class()
+            self.fallback.page_size = self.page_size
+            self.fallback.page_size_query_param = self.page_size_query_param
+            self.fallback.max_page_size = self.max_page_size
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.ordering = getattr(view, 'keyset_ordering', self.ordering)
+        page_size = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request)
+        if values is not None:
+            values = self.coerce_cursor_values(queryset.model, values)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) != '0':
+            self.count = queryset.count()
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(self.ordering, values, reverse))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Moving backwards, "more" means there is a previous page; a forward
+        # page always has a previous one once a cursor was given, and vice versa.
+        self.has_next = (has_more if not reverse else True) and bool(rows)
+        self.has_previous = (values is not None if not reverse else has_more) and bool(rows)
+        self.page = rows
+        return rows
+
+    def _link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self._key(obj), reverse))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._link(self.page[-1], False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._link(self.page[0], True)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+
+        body = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            body = {'count': self.count, **body}
+        return Response(body)
@@ -181,6 +181,24 @@ SITE_URL = 'http://10.0.2.2:8000'  # For Android emulator
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache (local memory by default; set REDIS_CACHE_URL to share it between workers)
+REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'quickkart',
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        }
+    }
+
 #Channels Configuration(for WebSockets)
 ASGI_APPLICATION = 'core.asgi.application'
 CHANNEL_LAYERS = {
@@ -199,4 +217,58 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Firebase settings
 FIREBASE_PROJECT_ID = os.getenv('FIREBASE_PROJECT_ID', 'your-project-id')
-FIREBASE_SERVICE_ACCOUNT_KEY_PATH = os.path.join(BASE_DIR, 'firebase-service-account.json')
\ No newline at end of file
+FIREBASE_SERVICE_ACCOUNT_KEY_PATH = os.path.join(BASE_DIR, 'firebase-service-account.json')
+
+# Store serviceability lookups (see apps/stores/spatial.py and serviceability.py)
+STORE_INDEX_REBUILD_INTERVAL = 300  # seconds; picks up changes made by other workers
+SERVICEABILITY_GEOHASH_PRECISION = 6  # ~1.2 x 0.6 km cells
+SERVICEABILITY_CACHE_TIMEOUT = 60 * 60
+SERVICEABILITY_LOCAL_CACHE_TIMEOUT = 30  # with the per-process LocMem cache, where store-change invalidation doesn't reach other workers
+DELIVERY_FEE_PER_KM = 0  # added to Store.delivery_fee for fee estimates on /api/stores/nearest/
+
+# Product search (see apps/products/search.py); use
+# 'apps.products.search.DatabaseSearchBackend' to rely on MySQL FULLTEXT instead
+PRODUCT_SEARCH_BACKEND = 'apps.products.search.InvertedIndexBackend'
+PRODUCT_SEARCH_RESULT_LIMIT = 500
+PRODUCT_INDEX_REBUILD_INTERVAL = 300
+PRODUCT_FUZZY_THRESHOLD = 0.3  # trigram similarity for ?fuzzy=1 searches
+
+# Cached home screen payload (see apps/stores/home.py)
+HOME_PAYLOAD_TIMEOUT = 60 * 60
+HOME_PAYLOAD_LOCAL_TIMEOUT = 30  # with the per-process LocMem cache, where version bumps don't reach other workers
+
+# Resized image variants served alongside uploads (see core/images.py)
+IMAGE_VARIANT_WIDTHS = (80, 160, 320, 640)
+IMAGE_VARIANT_FORMAT = 'WEBP'  # or 'JPEG'
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANT_FAILURE_TIMEOUT = 60 * 60  # missing or unreadable originals are retried after this long
+
+# Idempotency-Key handling for order placement (see apps/orders/idempotency.py)
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_PENDING_TIMEOUT = 60  # a claimed key is released if its request never finishes
+
+# Background jobs (see core/dispatch.py). Without a broker, jobs run on an
+# in-process thread pool instead of Celery workers.
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+DISPATCH_THREAD_WORKERS = 4
+NOTIFICATION_MAX_RETRIES = 5
+
+# Push notification transport (see core/utils/fcm.py). 'core.utils.fcm.HTTPSender'
+# posts batches to FCM_HTTP_SENDER_URL instead, e.g. a local fake server.
+FCM_SENDER = 'core.utils.fcm.FirebaseSender'
+FCM_HTTP_SENDER_URL = os.getenv('FCM_HTTP_SENDER_URL', 'http://127.0.0.1:8765/batch')
+FCM_HTTP_SENDER_TIMEOUT = 10
+
+# Delivery partner location uploads (see apps/delivery/views.py)
+LOCATION_BATCH_MAX_FIXES = 500
+TRACKING_POSITION_TIMEOUT = 6 * 60 * 60  # latest position per delivery (see apps/delivery/tracking.py)
+TRACKING_FALLBACK_TIMEOUT = 30  # position read back from stored fixes when none is cached
+TRACKING_PUSH_MIN_INTERVAL = 1.0  # seconds between position pushes per tracking WebSocket
+TRACKING_TRAIL_TOLERANCE_M = 10  # fixes closer than this to a delivered trail's line are dropped
+
+# Location history retention (see apps/delivery/management/commands/prune_locations.py)
+LOCATION_RETENTION_DAYS = 30
+LOCATION_ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive', 'locations')
@@ -1,7 +1,17 @@
 import firebase_admin
-from firebase_admin import credentials, messaging
+from firebase_admin import credentials, exceptions
 from django.conf import settings
 import os
+from .fcm import FCMUnavailable, send_to_tokens
+
+# FCM failures worth retrying from the notification worker (see core/dispatch.py)
+TRANSIENT_FCM_ERRORS = (
+    FCMUnavailable,
+    exceptions.UnavailableError,
+    exceptions.InternalError,
+    exceptions.DeadlineExceededError,
+    exceptions.ResourceExhaustedError,
+)
 
 def initialize_firebase():
     """Initialize Firebase Admin SDK if not already initialized"""
@@ -17,25 +27,38 @@ def initialize_firebase():
 def send_push_notification(token, title, body, data=None):
     """Send push notification to a specific FCM token"""
     try:
-        initialize_firebase()
-        message= messaging.Message(
-            notification = messaging.Notification(
-                title=title,
-                body=body,
-            ),
-            token=token,
-            data=data or {}
-        )
-        response = messaging.send(message)
-        return response 
+        result = send_to_tokens([token], data=data, title=title, body=body)[0]
+        if not result.success:
+            print(f"Error sending push notification: {result.error_code} {result.error}")
+        return result.message_id
+    except TRANSIENT_FCM_ERRORS:
+        raise
+    except Exception as e:
+        print(f"Error sending push notification: {e}")
+
+def send_user_notification(user, title, body, data=None, tokens=None):
+    """Send push notification to every active device of ``user``"""
+    from apps.users.devices import active_tokens
+    try:
+        if tokens is None:
+            tokens = active_tokens(user)
+        results = send_to_tokens(tokens, data=data, title=title, body=body)
+        for result in results:
+            if not result.success:
+                print(f"Error sending push notification to {user.username}: {result.error_code} {result.error}")
+        return sum(1 for result in results if result.success)
+    except TRANSIENT_FCM_ERRORS:
+        raise
     except Exception as e:
         print(f"Error sending push notification: {e}")
 
 def send_order_status_notification(order, new_status):
     """Send notification based on order status change"""
+    from apps.users.devices import active_tokens
     customer = order.customer
+    tokens = active_tokens(customer)
 
-    if not customer.fcm_token:
+    if not tokens:
         print(f"No FCM token for customer {customer.username}")
         return
     
@@ -65,14 +88,15 @@ def send_order_status_notification(order, new_status):
         notification_data = notifications[new_status]
 
         # Send notification to customer for all status updates
-        send_push_notification(
-            customer.fcm_token,
+        send_user_notification(
+            customer,
             notification_data['title'],
             notification_data['body'],
             data={
                 'order_id': str(order.id),
                 'status': new_status
-            }
+            },
+            tokens=tokens
         )
 
         # Send notification to admin for all status updates
@@ -85,38 +109,23 @@ def send_order_status_notification(order, new_status):
         )
 
 def send_admin_notification(title, body, data=None):
-    """Send notification to admin devices"""
-    initialize_firebase()
+    """Send notification to admin devices, up to 500 per FCM request"""
     try:
+        from apps.users.devices import active_tokens
         from apps.users.models import User
-        admin_users = User.objects.filter(
-            user_type='admin',
-            fcm_token__isnull=False
-        )
+        tokens = active_tokens(user_type='admin')
 
-        if not admin_users:
+        if not tokens:
             print("No admin users with FCM tokens found")
             print(f"Total admin users: {User.objects.filter(user_type='admin').count()}")
-            print(f"Admin users without FCM tokens: {list(User.objects.filter(user_type='admin', fcm_token__isnull=True).values_list('username', flat=True))}")
+            print(f"Admin users without FCM tokens: {list(User.objects.filter(user_type='admin').exclude(device_tokens__is_active=True).values_list('username', flat=True))}")
             return
 
-        success_count = 0
-        for admin in admin_users:
-            try:
-                message = messaging.Message(
-                    notification=messaging.Notification(
-                        title=title,
-                        body=body
-                    ),
-                    token=admin.fcm_token,
-                    data=data or {}
-                )
-
-                response = messaging.send(message)
-                success_count += 1
-                print(f"Admin notification sent to {admin.username}: {response}")
-            except Exception as e:
-                print(f"Failed to send notification to {admin.username}: {e}")
+        results = send_to_tokens(tokens, data=data, title=title, body=body)
+        success_count = sum(1 for result in results if result.success)
+        for result in results:
+            if not result.success:
+                print(f"Failed to send admin notification to {result.token[:12]}...: {result.error_code}")
 
         print(f"Admin notification sent to: {success_count} devices")
         return success_count
@@ -124,13 +133,13 @@ def send_admin_notification(title, body, data=None):
         print(f"Error sending admin notification: {e}")
 
 def send_chat_message_fcm(recipient_user, room, message):
-    """Send FCM data message for new chat message. Recipient must have fcm_token."""
+    """Send FCM data message for new chat message to the recipient's devices"""
+    from apps.users.devices import active_tokens
     try:
-        if not getattr(recipient_user, 'fcm_token', None) or not recipient_user.fcm_token:
+        tokens = active_tokens(recipient_user)
+        if not tokens:
             print(f"No FCM token for {recipient_user.username}, skipping chat FCM")
             return
-        initialize_firebase()
-        from firebase_admin import messaging
         data = {
             'type': 'chat_message',
             'room_id': str(room.id),
@@ -142,26 +151,27 @@ def send_chat_message_fcm(recipient_user, room, message):
             'is_read': 'false',
             'created_at': message.created_at.isoformat(),
         }
-        msg = messaging.Message(
-            data=data,
-            token=recipient_user.fcm_token,
-        )
-        messaging.send(msg)
+        for result in send_to_tokens(tokens, data=data):
+            if not result.success:
+                print(f"Error sending chat FCM: {result.error_code} {result.error}")
+    except TRANSIENT_FCM_ERRORS:
+        raise
     except Exception as e:
         print(f"Error sending chat FCM: {e}")
 
 
 def send_delivery_notification(order, notification_type):
     """Send notification to assigned delivery partner"""
-    initialize_firebase()
     try:
         assignment = order.delivery_assignment
         if not assignment:
             print(f"No delivery assignment found for order {order.id}")
             return
         
+        from apps.users.devices import active_tokens
         delivery_partner = assignment.delivery_partner
-        if not delivery_partner.fcm_token:
+        tokens = active_tokens(delivery_partner)
+        if not tokens:
             print(f"No FCM token for delivery partner {delivery_partner.username}")
             return
         
@@ -178,15 +188,18 @@ def send_delivery_notification(order, notification_type):
         if notification_type in notifications:
             notification_data = notifications[notification_type]
 
-            send_push_notification(
-                delivery_partner.fcm_token,
+            send_user_notification(
+                delivery_partner,
                 notification_data['title'],
                 notification_data['body'],
                 data={
                     'order_id': str(order.id),
                     'type': notification_type,
                     'status': order.status
-                }
+                },
+                tokens=tokens
             )
+    except TRANSIENT_FCM_ERRORS:
+        raise
     except Exception as e: 
         print(f"Error sending delivery notification: {e}")
\ No newline at end of file
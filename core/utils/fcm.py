@@ -0,0 +1,162 @@
+"""Batched FCM delivery.
+
+``send_to_tokens`` groups tokens into multicast batches of at most
+``max_batch`` (500, the FCM limit) and returns one ``SendResult`` per token.
+The transport is pluggable through ``FCM_SENDER``: ``FirebaseSender`` talks
+to FCM through firebase_admin, ``HTTPSender`` posts batches as JSON to any
+URL (used with a local fake server to benchmark throughput, see
+bench_fcm.py).
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from firebase_admin import exceptions, messaging
+
+UNREGISTERED = 'UNREGISTERED'
+INVALID_ARGUMENT = 'INVALID_ARGUMENT'
+SENDER_ID_MISMATCH = 'SENDER_ID_MISMATCH'
+QUOTA_EXCEEDED = 'QUOTA_EXCEEDED'
+THIRD_PARTY_AUTH_ERROR = 'THIRD_PARTY_AUTH_ERROR'
+UNAVAILABLE = 'UNAVAILABLE'
+INTERNAL = 'INTERNAL'
+UNKNOWN = 'UNKNOWN'
+
+# Per-token failures that may succeed if sent again later
+TRANSIENT_ERROR_CODES = {UNAVAILABLE, INTERNAL, QUOTA_EXCEEDED, 'DEADLINE_EXCEEDED', 'RESOURCE_EXHAUSTED'}
+
+
+class FCMUnavailable(Exception):
+    """Nothing was delivered and every failure was transient; worth retrying"""
+
+
+@dataclass
+class SendResult:
+    token: str
+    message_id: str = None
+    error_code: str = None
+    error: str = None
+    # The whole batch failed with one exception, so the error says nothing about this token
+    batch_error: bool = False
+
+    @property
+    def success(self):
+        return self.error_code is None
+
+    @property
+    def transient(self):
+        return self.error_code in TRANSIENT_ERROR_CODES
+
+
+class FCMSender:
+    """Sends one multicast batch; subclasses implement ``send_batch``"""
+    max_batch = 500
+
+    def send_batch(self, tokens, data, title=None, body=None):
+        """Return a ``SendResult`` for each token, in order"""
+        raise NotImplementedError
+
+
+def _error_code(error):
+    if isinstance(error, messaging.UnregisteredError):
+        return UNREGISTERED
+    if isinstance(error, messaging.SenderIdMismatchError):
+        return SENDER_ID_MISMATCH
+    if isinstance(error, messaging.QuotaExceededError):
+        return QUOTA_EXCEEDED
+    if isinstance(error, messaging.ThirdPartyAuthError):
+        return THIRD_PARTY_AUTH_ERROR
+    if isinstance(error, exceptions.FirebaseError):
+        return error.code
+    return UNKNOWN
+
+
+class FirebaseSender(FCMSender):
+    """Sends through the Firebase Admin SDK with ``send_each_for_multicast``"""
+
+    def send_batch(self, tokens, data, title=None, body=None):
+        from . import initialize_firebase
+        initialize_firebase()
+
+        message = messaging.MulticastMessage(
+            tokens=tokens,
+            data=data,
+            notification=messaging.Notification(title=title, body=body) if title or body else None,
+        )
+        try:
+            batch = messaging.send_each_for_multicast(message)
+        except exceptions.FirebaseError as error:
+            return [
+                SendResult(token, error_code=_error_code(error), error=str(error), batch_error=True)
+                for token in tokens
+            ]
+
+        results = []
+        for token, response in zip(tokens, batch.responses):
+            if response.success:
+                results.append(SendResult(token, message_id=response.message_id))
+            else:
+                error = response.exception
+                results.append(SendResult(token, error_code=_error_code(error), error=str(error)))
+        return results
+
+
+class HTTPSender(FCMSender):
+    """Posts each batch as JSON to ``FCM_HTTP_SENDER_URL``.
+
+    The endpoint receives ``{"tokens", "data", "notification"}`` and answers
+    ``{"results": [{"message_id": ...} or {"error": CODE}, ...]}``, one entry
+    per token.
+    """
+
+    def __init__(self):
+        self.url = settings.FCM_HTTP_SENDER_URL
+        self.session = requests.Session()
+
+    def send_batch(self, tokens, data, title=None, body=None):
+        payload = {
+            'tokens': tokens,
+            'data': data,
+            'notification': {'title': title, 'body': body} if title or body else None,
+        }
+        try:
+            response = self.session.post(self.url, json=payload, timeout=settings.FCM_HTTP_SENDER_TIMEOUT)
+            response.raise_for_status()
+            entries = response.json()['results']
+        except (requests.RequestException, ValueError, KeyError) as error:
+            return [SendResult(token, error_code=UNAVAILABLE, error=str(error), batch_error=True) for token in tokens]
+
+        return [
+            SendResult(token, message_id=entry.get('message_id'), error_code=entry.get('error'), error=entry.get('error'))
+            for token, entry in zip(tokens, entries)
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_sender():
+    return import_string(settings.FCM_SENDER)()
+
+
+def send_to_tokens(tokens, data=None, title=None, body=None):
+    """Send one message to many tokens in as few batches as possible.
+
+    Duplicate and empty tokens are dropped. Outcomes are reported to the
+    device token registry, which deactivates dead tokens. Raises
+    ``FCMUnavailable`` only when nothing was delivered and every failure was
+    transient, so a retry can't send a duplicate to anyone.
+    """
+    from apps.users.devices import record_send_results
+
+    tokens = list(dict.fromkeys(token for token in tokens if token))
+    data = {key: str(value) for key, value in (data or {}).items()}
+    sender = get_sender()
+
+    results = []
+    for start in range(0, len(tokens), sender.max_batch):
+        results.extend(sender.send_batch(tokens[start:start + sender.max_batch], data, title=title, body=body))
+    record_send_results(results)
+
+    if results and all(not result.success and result.transient for result in results):
+        raise FCMUnavailable(results[0].error)
+    return results
@@ -0,0 +1,39 @@
+"""JWT authentication for WebSocket consumers.
+
+Browsers cannot set headers on a WebSocket handshake, so clients pass their
+access token in the query string (``ws/...?token=<access token>``).
+"""
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from jwt import decode as jwt_decode
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import UntypedToken
+
+User = get_user_model()
+
+
+def token_from_scope(scope):
+    """Access token from the connection's query string, or None"""
+    query = parse_qs(scope.get('query_string', b'').decode())
+    return query.get('token', [None])[-1] or None
+
+
+@database_sync_to_async
+def get_user_from_token(token):
+    """User the JWT ``token`` was issued to, or None if it is invalid"""
+    try:
+        UntypedToken(token)
+        decoded_data = jwt_decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        return User.objects.get(id=decoded_data.get('user_id'))
+    except (InvalidToken, TokenError, User.DoesNotExist):
+        return None
+
+
+async def authenticate_scope(scope):
+    """User behind the connection's ``?token=``, or None"""
+    token = token_from_scope(scope)
+    if not token:
+        return None
+    return await get_user_from_token(token)